@@ -4,14 +4,20 @@ SPI Configuration Parser
 Extracts SPI parameters from GitHub issue text and validates them.
 """
 
+import os
 import re
 import json
 import sys
 from typing import Dict, Any, Optional, List
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 
 
-@dataclass
+# Slotted SPIConfig instances where dataclasses support it (Python 3.10+);
+# older interpreters fall back to a regular dataclass
+_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class SPIConfig:
     """SPI Configuration parameters"""
     issue_number: int
@@ -39,37 +45,115 @@ class SPIConfig:
     clock_divider: int = 2  # System clock divider for SCLK
     fifo_depth: int = 16  # FIFO buffer depth
     max_slaves: int = 8  # Maximum slaves supported
+    trace_depth: int = 1  # $dumpvars depth: 1 only testbench signals, 0 dumps every level
     custom_features: Dict[str, Any] = None  # For future extensions
 
 
+# One scanner for every issue field, walked once per body by finditer.
+# Each alternative sits inside a lookahead so no match consumes text, and
+# no two labels can start at the same offset, so the first match of each
+# named group is exactly what a separate search per field would return.
+#
+# Issue form bodies put the value on its own line after a "### Label"
+# header, so the gap between label and value may span lines. Numeric gaps
+# are tempered against the label itself: a later repeat of the label
+# yields the same first number, so each attempt stops there instead of
+# running to the end of the body once per repeat. The features
+# alternative only marks where the block starts; the block itself is read
+# once by _FEATURES_BLOCK_RE.
+_FIELD_SCAN_RE = re.compile(
+    r'(?='
+    r'(?:SPI Mode|Mode)(?:(?!Mode)[^0-9])*(?P<mode>\d)'
+    r'|(?:Data Width|Width)(?:(?!Width)[^0-9])*(?P<data_width>\d+)'
+    r'|(?:Number of Slaves|Slaves)(?:(?!Slaves)[^0-9])*(?P<num_slaves>\d+)'
+    r'|(?:Clock Frequency|Frequency)(?:(?!Frequency)[^0-9])*(?P<clock_freq>\d+(?:\.\d+)?)'
+    r'|Special Features(?:(?!Special Features)[^:])*:(?P<features>)'
+    r'|Test Duration[^:]*(?::\s*)?(?P<test_duration>Brief|Standard|Comprehensive)'
+    r'|Clock Jitter Testing[^:]*(?::\s*)?(?P<clock_jitter>Yes|No)'
+    r'|Waveform Capture[^:]*(?::\s*)?(?P<waveform>Yes|No)'
+    r'|(?:## Email Address|Email)\s*(?::\s*)?(?P<email>[^\n\r]+)'
+
+    # New enhanced features
+    r'|SPI Role[^:]*(?::\s*)?(?P<spi_role>Master|Slave|Dual)'
+    r'|Default Data[^:]*(?::\s*)?(?P<default_data>Enabled|Disabled)'
+    r'|Data Pattern[^:]*(?::\s*)?(?P<data_pattern>A5A5|FFFF|0000|5555|Custom)'
+    r'|Custom Data Value[^:]*(?::\s*)?(?P<custom_data>[0-9A-Fa-f]+)'
+    r'|Clock Divider(?:(?!Clock Divider)[^0-9])*(?P<clock_divider>\d+)'
+    r'|FIFO Depth(?:(?!FIFO Depth)[^0-9])*(?P<fifo_depth>\d+)'
+    r'|Maximum Slaves(?:(?!Maximum Slaves)[^0-9])*(?P<max_slaves>\d+)'
+    r'|Trace Depth(?:(?!Trace Depth)[^0-9])*(?P<trace_depth>\d+)'
+    r'|GitHub Username[^:]*(?::\s*)?(?P<github_user>[^\n\r]+)'
+    r')',
+    re.IGNORECASE
+)
+
+# Features block body: everything up to the next "###" header, blank line
+# or end of text, consumed greedily so nothing is retried
+_FEATURES_BLOCK_RE = re.compile(r'(?:(?!###|\n\n)[\s\S])*')
+
+# Feature keywords looked up inside the special features block
+_FEATURE_KEYWORDS_RE = re.compile(r'Interrupt|FIFO|DMA|Multi-master')
+
+# Checked checkbox rows for slave select behavior and data order
+_CHECKED_SLAVE_RE = re.compile(r'\[x\]\s*Active (Low|High)', re.IGNORECASE)
+_CHECKED_ORDER_RE = re.compile(r'\[x\]\s*(MSB|LSB) First', re.IGNORECASE)
+
+
+# Accepted values for the enumerated fields
+_VALID_MODES = frozenset({0, 1, 2, 3})
+_VALID_TEST_DURATIONS = frozenset({'brief', 'standard', 'comprehensive'})
+_VALID_SPI_ROLES = frozenset({'master', 'slave', 'dual'})
+_VALID_DATA_PATTERNS = frozenset({'a5a5', 'ffff', '0000', '5555', 'custom'})
+
+def _is_valid_custom_data(params: Dict[str, Any]) -> bool:
+    """Custom data patterns need a hex data value (pattern already lowered)"""
+    if params['default_data_pattern'] != 'custom':
+        return True
+    try:
+        int(params['default_data_value'], 16)
+    except ValueError:
+        return False
+    return True
+
+
+# Fields compared case-insensitively; _validate_config lowers them once
+_CASE_INSENSITIVE_FIELDS = ('test_duration', 'spi_role', 'default_data_pattern')
+
+# Checks run in order by _validate_config as (check, error message); checks
+# get the parameters with _CASE_INSENSITIVE_FIELDS lowered, and each message
+# is formatted with the parameters as parsed
+_VALIDATORS = (
+    (lambda p: p['mode'] in _VALID_MODES,
+     "Invalid SPI mode: {mode}. Must be 0, 1, 2, or 3."),
+    # Standard 8/16/32 widths all fall inside the 1-64 range
+    (lambda p: 1 <= p['data_width'] <= 64,
+     "Data width {data_width} bits is not supported (1-64 bits or standard 8/16/32)"),
+    (lambda p: 1 <= p['num_slaves'] <= 32,
+     "Number of slaves {num_slaves} is out of range (1-32)"),
+    (lambda p: p['test_duration'] in _VALID_TEST_DURATIONS,
+     "Invalid test duration: {test_duration}"),
+    (lambda p: p['spi_role'] in _VALID_SPI_ROLES,
+     "Invalid SPI role: {spi_role}"),
+    (lambda p: p['default_data_pattern'] in _VALID_DATA_PATTERNS,
+     "Invalid data pattern: {default_data_pattern}"),
+    (_is_valid_custom_data,
+     "Invalid custom data value: {default_data_value}"),
+    (lambda p: 1 <= p['clock_divider'] <= 1024,
+     "Clock divider {clock_divider} out of range (1-1024)"),
+    (lambda p: 2 <= p['fifo_depth'] <= 1024,
+     "FIFO depth {fifo_depth} out of range (2-1024)"),
+    (lambda p: 1 <= p['max_slaves'] <= 32,
+     "Max slaves {max_slaves} out of range (1-32)"),
+    (lambda p: 0 <= p['trace_depth'] <= 64,
+     "Trace depth {trace_depth} out of range (0-64)"),
+    # Email is required for notification delivery
+    (lambda p: bool(p['email']) and '@' in p['email'],
+     "Valid email address is required for notification delivery"),
+)
+
 class SPIConfigParser:
     """Parses GitHub issue text to extract SPI configuration"""
 
-    def __init__(self):
-        self.patterns = {
-            'mode': r'(?:SPI Mode|Mode)[^0-9]*(\d)',
-            'data_width': r'(?:Data Width|Width)[^0-9]*(\d+)',
-            'num_slaves': r'(?:Number of Slaves|Slaves)[^0-9]*(\d+)',
-            'clock_freq': r'(?:Clock Frequency|Frequency)[^0-9]*(\d+(?:\.\d+)?)',
-            'slave_active': r'\[[^\]]*\]\s*Active (Low|High)',
-            'data_order': r'\[[^\]]*\]\s*(MSB|LSB) First',
-            'features': r'Special Features[^:]*:([\s\S]*?)(?=###|\n\n|\Z)',
-            'test_duration': r'Test Duration[^:]*:?\s*(Brief|Standard|Comprehensive)',
-            'clock_jitter': r'Clock Jitter Testing[^:]*:?\s*(Yes|No)',
-            'waveform': r'Waveform Capture[^:]*:?\s*(Yes|No)',
-            'email': r'(?:## Email Address|Email)\s*:?\s*\n?\s*([^\n\r]+)',
-
-            # New enhanced features
-            'spi_role': r'SPI Role[^:]*:?\s*(Master|Slave|Dual)',
-            'default_data': r'Default Data[^:]*:?\s*(Enabled|Disabled)',
-            'data_pattern': r'Data Pattern[^:]*:?\s*(A5A5|FFFF|0000|5555|Custom)',
-            'custom_data': r'Custom Data Value[^:]*:?\s*([0-9A-Fa-f]+)',
-            'clock_divider': r'Clock Divider[^0-9]*(\d+)',
-            'fifo_depth': r'FIFO Depth[^0-9]*(\d+)',
-            'max_slaves': r'Maximum Slaves[^0-9]*(\d+)',
-            'github_user': r'GitHub Username[^:]*:?\s*([^\n\r]+)'
-        }
-
     def parse_issue(self, issue_body: str, issue_number: int) -> SPIConfig:
         """
         Parse GitHub issue body to extract SPI configuration
@@ -89,9 +173,15 @@ class SPIConfigParser:
         # Extract all parameters
         params = {}
 
-        # Required parameters
-        mode_value = self._extract_single(issue_body, self.patterns['mode'])
-        data_width_value = self._extract_single(issue_body, self.patterns['data_width'])
+        # Required parameters - a cheap literal check on the lowered body lets
+        # issues without an SPI mode fail before the scanner runs
+        if 'mode' not in issue_body.lower():
+            raise ValueError("Missing required parameter: SPI Mode")
+
+        # Every other field comes from a single pass over the body
+        fields = self._scan_fields(issue_body)
+        mode_value = fields.get('mode')
+        data_width_value = fields.get('data_width')
 
         # Validate required parameters
         if mode_value is None:
@@ -106,8 +196,8 @@ class SPIConfigParser:
             raise ValueError(f"Invalid required parameters: {e}")
 
         # Optional parameters with defaults
-        num_slaves_value = self._extract_single(issue_body, self.patterns['num_slaves'])
-        clock_freq_value = self._extract_single(issue_body, self.patterns['clock_freq'])
+        num_slaves_value = fields.get('num_slaves')
+        clock_freq_value = fields.get('clock_freq')
 
         try:
             params['num_slaves'] = int(num_slaves_value) if num_slaves_value else 1
@@ -115,45 +205,44 @@ class SPIConfigParser:
         except (ValueError, TypeError) as e:
             raise ValueError(f"Invalid optional parameter values: {e}")
 
-        # Parse slave select behavior - find the line with checked checkbox
-        slave_matches = re.findall(r'(\[[^\]]*\]\s*Active (Low|High))', issue_body, re.IGNORECASE | re.MULTILINE)
-        slave_checked = [full_line for full_line, value in slave_matches if '[x]' in full_line or '[X]' in full_line]
-        params['slave_active_low'] = len(slave_checked) == 0 or 'Low' in slave_checked[0]  # Default to Low if none checked or Low is checked
+        # Parse slave select behavior - find the first checked checkbox
+        slave_checked = _CHECKED_SLAVE_RE.search(issue_body)
+        params['slave_active_low'] = slave_checked is None or 'Low' in slave_checked.group(1)  # Default to Low if none checked or Low is checked
 
-        # Parse data order - find the line with checked checkbox
-        data_order_matches = re.findall(r'(\[[^\]]*\]\s*(MSB|LSB) First)', issue_body, re.IGNORECASE | re.MULTILINE)
-        data_order_checked = [full_line for full_line, value in data_order_matches if '[x]' in full_line or '[X]' in full_line]
-        params['msb_first'] = len(data_order_checked) == 0 or 'MSB' in data_order_checked[0]  # Default to MSB if none checked or MSB is checked
-        email_value = self._extract_single(issue_body, self.patterns['email']) or ''
-        params['email'] = email_value.strip()
-        params['github_username'] = self._extract_single(issue_body, self.patterns['github_user']) or ''
+        # Parse data order - find the first checked checkbox
+        data_order_checked = _CHECKED_ORDER_RE.search(issue_body)
+        params['msb_first'] = data_order_checked is None or 'MSB' in data_order_checked.group(1)  # Default to MSB if none checked or MSB is checked
+        params['email'] = fields.get('email') or ''
+        params['github_username'] = fields.get('github_user') or ''
 
         # Feature flags
-        features_text = self._extract_single(issue_body, self.patterns['features']) or ''
-        params['interrupts'] = 'Interrupt' in features_text
-        params['fifo_buffers'] = 'FIFO' in features_text
-        params['dma_support'] = 'DMA' in features_text
-        params['multi_master'] = 'Multi-master' in features_text
+        features = set(_FEATURE_KEYWORDS_RE.findall(fields.get('features') or ''))
+        params['interrupts'] = 'Interrupt' in features
+        params['fifo_buffers'] = 'FIFO' in features
+        params['dma_support'] = 'DMA' in features
+        params['multi_master'] = 'Multi-master' in features
 
         # Test configuration
-        params['test_duration'] = self._extract_single(issue_body, self.patterns['test_duration']) or 'standard'
-        params['clock_jitter_test'] = 'Yes' in (self._extract_single(issue_body, self.patterns['clock_jitter']) or 'No')
-        params['waveform_capture'] = 'Yes' in (self._extract_single(issue_body, self.patterns['waveform']) or 'Yes')
+        params['test_duration'] = fields.get('test_duration') or 'standard'
+        params['clock_jitter_test'] = 'Yes' in (fields.get('clock_jitter') or 'No')
+        params['waveform_capture'] = 'Yes' in (fields.get('waveform') or 'Yes')
 
         # Enhanced features
-        params['spi_role'] = self._extract_single(issue_body, self.patterns['spi_role']) or 'master'
-        params['default_data_enabled'] = 'Enabled' in (self._extract_single(issue_body, self.patterns['default_data']) or 'Disabled')
-        params['default_data_pattern'] = self._extract_single(issue_body, self.patterns['data_pattern']) or 'a5a5'
-        params['default_data_value'] = self._extract_single(issue_body, self.patterns['custom_data']) or 'A5A5'
+        params['spi_role'] = fields.get('spi_role') or 'master'
+        params['default_data_enabled'] = 'Enabled' in (fields.get('default_data') or 'Disabled')
+        params['default_data_pattern'] = fields.get('data_pattern') or 'a5a5'
+        params['default_data_value'] = fields.get('custom_data') or 'A5A5'
 
         # Advanced configuration
-        clock_div_value = self._extract_single(issue_body, self.patterns['clock_divider'])
-        fifo_depth_value = self._extract_single(issue_body, self.patterns['fifo_depth'])
-        max_slaves_value = self._extract_single(issue_body, self.patterns['max_slaves'])
+        clock_div_value = fields.get('clock_divider')
+        fifo_depth_value = fields.get('fifo_depth')
+        max_slaves_value = fields.get('max_slaves')
+        trace_depth_value = fields.get('trace_depth')
 
         params['clock_divider'] = int(clock_div_value) if clock_div_value else 2
         params['fifo_depth'] = int(fifo_depth_value) if fifo_depth_value else 16
         params['max_slaves'] = int(max_slaves_value) if max_slaves_value else 8
+        params['trace_depth'] = int(trace_depth_value) if trace_depth_value else 1
 
         # Validate configuration
         self._validate_config(params)
@@ -162,61 +251,33 @@ class SPIConfigParser:
         print(f"✅ Successfully parsed configuration: Mode {config.mode}, {config.data_width}-bit")
         return config
 
-    def _extract_single(self, text: str, pattern: str) -> Optional[str]:
-        """Extract first match from text using regex pattern"""
-        match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-        return match.group(1).strip() if match else None
+    def _scan_fields(self, text: str) -> Dict[str, str]:
+        """Collect the first value of every issue field in one pass"""
+        found = {}
+        for match in _FIELD_SCAN_RE.finditer(text):
+            name = match.lastgroup
+            if name in found:
+                continue
+            if name == 'features':
+                found[name] = _FEATURES_BLOCK_RE.match(text, match.end(name)).group().strip()
+            else:
+                found[name] = match.group(name).strip()
+            if len(found) == len(_FIELD_SCAN_RE.groupindex):
+                break
+        return found
 
     def _validate_config(self, params: Dict[str, Any]) -> None:
         """Validate the parsed configuration parameters"""
 
-        # Validate SPI mode
-        if params['mode'] not in [0, 1, 2, 3]:
-            raise ValueError(f"Invalid SPI mode: {params['mode']}. Must be 0, 1, 2, or 3.")
-
-        # Validate data width
-        if params['data_width'] not in [8, 16, 32] and not (1 <= params['data_width'] <= 64):
-            raise ValueError(f"Data width {params['data_width']} bits is not supported (1-64 bits or standard 8/16/32)")
-
-        # Validate number of slaves
-        if not (1 <= params['num_slaves'] <= 32):
-            raise ValueError(f"Number of slaves {params['num_slaves']} is out of range (1-32)")
-
-        # Validate test duration
-        if params['test_duration'].lower() not in ['brief', 'standard', 'comprehensive']:
-            raise ValueError(f"Invalid test duration: {params['test_duration']}")
-
-        # Validate SPI role
-        if params['spi_role'].lower() not in ['master', 'slave', 'dual']:
-            raise ValueError(f"Invalid SPI role: {params['spi_role']}")
-
-        # Validate data pattern
-        valid_patterns = ['a5a5', 'ffff', '0000', '5555', 'custom']
-        if params['default_data_pattern'].lower() not in valid_patterns:
-            raise ValueError(f"Invalid data pattern: {params['default_data_pattern']}")
-
-        # Validate custom data value if pattern is custom
-        if params['default_data_pattern'].lower() == 'custom':
-            try:
-                int(params['default_data_value'], 16)
-            except ValueError:
-                raise ValueError(f"Invalid custom data value: {params['default_data_value']}")
-
-        # Validate clock divider
-        if params['clock_divider'] < 1 or params['clock_divider'] > 1024:
-            raise ValueError(f"Clock divider {params['clock_divider']} out of range (1-1024)")
-
-        # Validate FIFO depth
-        if params['fifo_depth'] < 2 or params['fifo_depth'] > 1024:
-            raise ValueError(f"FIFO depth {params['fifo_depth']} out of range (2-1024)")
-
-        # Validate max slaves
-        if params['max_slaves'] < 1 or params['max_slaves'] > 32:
-            raise ValueError(f"Max slaves {params['max_slaves']} out of range (1-32)")
+        # Case-insensitive fields are lowered once up front; checks see the
+        # lowered values while error messages keep what the user wrote
+        lowered = dict(params)
+        for field in _CASE_INSENSITIVE_FIELDS:
+            lowered[field] = params[field].lower()
 
-        # Validate email (required for email functionality)
-        if not params['email'] or '@' not in params['email']:
-            raise ValueError("Valid email address is required for notification delivery")
+        for check, message in _VALIDATORS:
+            if not check(lowered):
+                raise ValueError(message.format_map(params))
 
 
 def main():
@@ -260,30 +321,13 @@ def main():
         config = parser.parse_issue(sample_issue, int(sys.argv[1]))
 
         # Create issue-specific results directory
-        issue_dir = f'results/issue-{issue_number}'
+        issue_dir = f'results/issue-{config.issue_number}'
         os.makedirs(issue_dir, exist_ok=True)
 
         # Save configuration to JSON
         config_file = os.path.join(issue_dir, 'spi_config.json')
         with open(config_file, 'w') as f:
-            json.dump({
-                'issue_number': issue_number,
-                'mode': config.mode,
-                'data_width': config.data_width,
-                'num_slaves': config.num_slaves,
-                'slave_active_low': config.slave_active_low,
-                'msb_first': config.msb_first,
-                'interrupts': config.interrupts,
-                'fifo_buffers': config.fifo_buffers,
-                'dma_support': config.dma_support,
-                'multi_master': config.multi_master,
-                'test_duration': config.test_duration,
-                'clock_jitter_test': config.clock_jitter_test,
-                'clock_frequency': config.clock_frequency,
-                'waveform_capture': config.waveform_capture,
-                'email': config.email,
-                'github_username': config.github_username
-            }, f, indent=2)
+            json.dump(asdict(config), f, indent=2)
 
         print(f"✅ Configuration saved to {config_file}")
 
@@ -5,65 +5,33 @@ Sends SPI customization results to users via email
 """
 
 import os
-import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from email.mime.base import MIMEBase
-from email import encoders
-from typing import Dict, Any, List
+import threading
+from collections import defaultdict
+from typing import Dict, Any, List, Optional, TYPE_CHECKING
 import json
 
+# smtplib and the email.mime modules are only needed when a message is
+# actually built, so they are imported inside the methods that send it
+if TYPE_CHECKING:
+    from email.mime.multipart import MIMEMultipart
 
-class EmailSender:
-    """Handles sending email notifications with attachments"""
-
-    def __init__(self, smtp_server: str = "smtp.gmail.com", smtp_port: int = 587):
-        self.smtp_server = smtp_server
-        self.smtp_port = smtp_port
-        self.username = os.environ.get('SMTP_USERNAME')
-        self.password = os.environ.get('SMTP_PASSWORD')
-
-    def send_results_email(self, config: Dict[str, Any], attachments: List[str] = None) -> bool:
-        """
-        Send email with SPI customization results
-
-        Args:
-            config: Configuration dictionary
-            attachments: List of file paths to attach
-
-        Returns:
-            True if email sent successfully
-        """
-
-        if not self.username or not self.password:
-            print("⚠️  SMTP credentials not configured, skipping email")
-            return False
-
-        recipient = config.get('email', '')
-        if not recipient:
-            print("⚠️  No recipient email address found")
-            return False
 
-        # Create message
-        msg = MIMEMultipart('alternative')
-        msg['Subject'] = f"SPI Customization Complete - Issue #{config.get('issue_number', 'N/A')}"
-        msg['From'] = f"SPI Customizer <{self.username}>"
-        msg['To'] = recipient
-
-        # HTML email body
-        html_body = f"""
+# HTML body of the results email. Only the middle sections depend on the
+# configuration and are filled in with str.format_map; the head (styles and
+# banner) and the tail (next steps and support) are the same for every email.
+_HTML_HEAD = """
 <html>
 <head>
     <style>
-        body {{ font-family: Arial, sans-serif; margin: 20px; }}
-        .header {{ background-color: #f0f8ff; padding: 20px; border-radius: 10px; margin-bottom: 20px; }}
-        .success {{ color: #28a745; font-size: 24px; font-weight: bold; }}
-        .details {{ background-color: #f8f9fa; padding: 15px; border-radius: 5px; margin: 10px 0; }}
-        .feature {{ margin: 5px 0; }}
-        .enabled {{ color: #28a745; font-weight: bold; }}
-        .disabled {{ color: #6c757d; }}
-        .files {{ background-color: #e9ecef; padding: 15px; border-radius: 5px; }}
-        .code {{ font-family: 'Courier New', monospace; background-color: #f8f9fa; padding: 10px; border-radius: 3px; }}
+        body { font-family: Arial, sans-serif; margin: 20px; }
+        .header { background-color: #f0f8ff; padding: 20px; border-radius: 10px; margin-bottom: 20px; }
+        .success { color: #28a745; font-size: 24px; font-weight: bold; }
+        .details { background-color: #f8f9fa; padding: 15px; border-radius: 5px; margin: 10px 0; }
+        .feature { margin: 5px 0; }
+        .enabled { color: #28a745; font-weight: bold; }
+        .disabled { color: #6c757d; }
+        .files { background-color: #e9ecef; padding: 15px; border-radius: 5px; }
+        .code { font-family: 'Courier New', monospace; background-color: #f8f9fa; padding: 10px; border-radius: 3px; }
     </style>
 </head>
 <body>
@@ -72,27 +40,29 @@ class EmailSender:
         <p>Your custom SPI core has been generated and tested successfully.</p>
     </div>
 
-    <h2>📋 Configuration Summary</h2>
+"""
+
+_HTML_BODY_TEMPLATE = """    <h2>📋 Configuration Summary</h2>
     <div class="details">
-        <div class="feature"><strong>SPI Mode:</strong> {config.get('mode', 'N/A')}</div>
-        <div class="feature"><strong>Data Width:</strong> {config.get('data_width', 'N/A')} bits</div>
-        <div class="feature"><strong>Number of Slaves:</strong> {config.get('num_slaves', 'N/A')}</div>
-        <div class="feature"><strong>Slave Select:</strong> {'Active High' if not config.get('slave_active_low', True) else 'Active Low'}</div>
-        <div class="feature"><strong>Data Order:</strong> {'LSB First' if not config.get('msb_first', True) else 'MSB First'}</div>
+        <div class="feature"><strong>SPI Mode:</strong> {mode}</div>
+        <div class="feature"><strong>Data Width:</strong> {data_width} bits</div>
+        <div class="feature"><strong>Number of Slaves:</strong> {num_slaves}</div>
+        <div class="feature"><strong>Slave Select:</strong> {slave_select}</div>
+        <div class="feature"><strong>Data Order:</strong> {data_order}</div>
     </div>
 
     <h2>🔧 Enabled Features</h2>
     <div class="details">
-        <div class="feature">Interrupts: <span class="{'enabled' if config.get('interrupts') else 'disabled'}">{'✅' if config.get('interrupts') else '❌'}</span></div>
-        <div class="feature">FIFO Buffers: <span class="{'enabled' if config.get('fifo_buffers') else 'disabled'}">{'✅' if config.get('fifo_buffers') else '❌'}</span></div>
-        <div class="feature">DMA Support: <span class="{'enabled' if config.get('dma_support') else 'disabled'}">{'✅' if config.get('dma_support') else '❌'}</span></div>
-        <div class="feature">Multi-master: <span class="{'enabled' if config.get('multi_master') else 'disabled'}">{'✅' if config.get('multi_master') else '❌'}</span></div>
+        <div class="feature">Interrupts: <span class="{interrupts_class}">{interrupts_icon}</span></div>
+        <div class="feature">FIFO Buffers: <span class="{fifo_buffers_class}">{fifo_buffers_icon}</span></div>
+        <div class="feature">DMA Support: <span class="{dma_support_class}">{dma_support_icon}</span></div>
+        <div class="feature">Multi-master: <span class="{multi_master_class}">{multi_master_icon}</span></div>
     </div>
 
     <h2>📁 Generated Files</h2>
     <div class="files">
-        <div class="feature">• <strong>spi_master_mode{config.get('mode', 'X')}_{config.get('data_width', 'Z')}bit.v</strong> - Custom SPI core</div>
-        <div class="feature">• <strong>spi_master_tb_mode{config.get('mode', 'X')}.v</strong> - Verilog testbench</div>
+        <div class="feature">• <strong>spi_master_mode{file_mode}_{file_width}bit.v</strong> - Custom SPI core</div>
+        <div class="feature">• <strong>spi_master_tb_mode{file_mode}.v</strong> - Verilog testbench</div>
         <div class="feature">• <strong>test_spi.py</strong> - Python/Cocotb test</div>
         <div class="feature">• <strong>spi_config.json</strong> - Configuration file</div>
         <div class="feature">• <strong>spi_waveform.vcd</strong> - Simulation waveforms</div>
@@ -100,11 +70,13 @@ class EmailSender:
 
     <h2>🧪 Testing Results</h2>
     <div class="details">
-        <div class="feature"><strong>RTL Simulation:</strong> {'✅ Passed' if config.get('simulation_success') else '⚠️ Completed (simulation tools not available)'}</div>
-        <div class="feature"><strong>Test Duration:</strong> {config.get('test_duration', 'standard')}</div>
+        <div class="feature"><strong>RTL Simulation:</strong> {simulation_status}</div>
+        <div class="feature"><strong>Test Duration:</strong> {test_duration}</div>
     </div>
 
-    <h2>📝 Next Steps</h2>
+"""
+
+_HTML_TAIL = """    <h2>📝 Next Steps</h2>
     <div class="details">
         <ol>
             <li><strong>Download</strong> the generated files from the GitHub issue</li>
@@ -130,36 +102,215 @@ class EmailSender:
 </html>
 """
 
-        msg.attach(MIMEText(html_body, 'html'))
+# Attachment read size for base64 encoding, 57 bytes per encoded line
+_ATTACH_BLOCK_SIZE = 57 * 1024
 
-        # Add attachments
-        if attachments:
-            for file_path in attachments:
-                if os.path.exists(file_path):
-                    self._attach_file(msg, file_path)
+# Feature flags shown in the "Enabled Features" section, with the template
+# keys for their CSS class and icon
+_FEATURE_FLAG_KEYS = tuple(
+    (flag, f'{flag}_class', f'{flag}_icon')
+    for flag in ('interrupts', 'fifo_buffers', 'dma_support', 'multi_master')
+)
+_FEATURE_FLAG_LABELS = {True: ('enabled', '✅'), False: ('disabled', '❌')}
 
-        # Send email
+
+class EmailSender:
+    """Handles sending email notifications with attachments"""
+
+    def __init__(self, smtp_server: str = "smtp.gmail.com", smtp_port: int = 587,
+                 max_messages: int = 100):
+        self.smtp_server = smtp_server
+        self.smtp_port = smtp_port
+        self.username = os.environ.get('SMTP_USERNAME')
+        self.password = os.environ.get('SMTP_PASSWORD')
+        self._from_header = f"SPI Customizer <{self.username}>"
+
+        # Shared connection state; max_messages recycles a long-lived
+        # connection before the server is likely to drop it
+        self.max_messages = max_messages
+        self._persistent = False
+        self._server = None
+        self._server_messages = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        """Keep one SMTP connection open for all sends in the with block"""
+        self._persistent = True
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._persistent = False
+        self.close()
+        return False
+
+    def close(self):
+        """Close the shared SMTP connection, if one is open"""
+        with self._lock:
+            self._close()
+
+    def send_results_email(self, config: Dict[str, Any], attachments: List[str] = None) -> bool:
+        """
+        Send email with SPI customization results
+
+        Args:
+            config: Configuration dictionary
+            attachments: List of file paths to attach
+
+        Returns:
+            True if email sent successfully
+        """
+
+        if not self.username or not self.password:
+            print("⚠️  SMTP credentials not configured, skipping email")
+            return False
+
+        recipient = config.get('email', '')
+        if not recipient:
+            print("⚠️  No recipient email address found")
+            return False
+        # Same rule as SPIConfigParser: any address with an @, optionally
+        # with a display name ("Name <user@host>")
+        from email.utils import parseaddr
+        if '@' not in parseaddr(recipient)[1]:
+            print(f"⚠️  Invalid recipient email address: {recipient}")
+            return False
+
+        msg = self._build_message(config, recipient, attachments)
+
+        # Send email - inside a with block the connection is opened once and
+        # reused for every message, otherwise each call gets its own
+        server = None
         try:
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()
-            server.login(self.username, self.password)
-            server.sendmail(self.username, recipient, msg.as_string())
-            server.quit()
+            with self._lock:
+                server = self._get_connection()
+                # Serialize straight to CRLF bytes, as send_message does, instead of
+                # a str that sendmail would rewrite and encode again
+                server.sendmail(self.username, recipient,
+                                msg.as_bytes(policy=msg.policy.clone(linesep='\r\n')))
+                if self._persistent:
+                    self._server = server
+                    self._server_messages += 1
+                else:
+                    server.quit()
 
             print(f"✅ Email sent successfully to {recipient}")
             return True
 
         except Exception as e:
             print(f"❌ Failed to send email: {e}")
+            with self._lock:
+                # A connection opened for this call is not the shared one yet
+                if server is not None and server is not self._server:
+                    server.close()
+                self._close()
             return False
 
-    def _attach_file(self, msg: MIMEMultipart, file_path: str):
+    def _build_message(self, config: Dict[str, Any], recipient: str,
+                       attachments: Optional[List[str]]) -> 'MIMEMultipart':
+        """Build the results message for one recipient"""
+        from email.mime.multipart import MIMEMultipart
+        from email.mime.text import MIMEText
+
+        # Create message
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = f"SPI Customization Complete - Issue #{config.get('issue_number', 'N/A')}"
+        msg['From'] = self._from_header
+        msg['To'] = recipient
+
+        # HTML email body
+        html_body = ''.join((
+            _HTML_HEAD,
+            _HTML_BODY_TEMPLATE.format_map(self._template_context(config)),
+            _HTML_TAIL
+        ))
+
+        msg.attach(MIMEText(html_body, 'html'))
+
+        # Add attachments - _attach_file reports files that cannot be opened
+        if attachments:
+            for file_path in attachments:
+                self._attach_file(msg, file_path)
+
+        return msg
+
+    def _get_connection(self):
+        """Return the shared connection if it is still usable, else a new one"""
+        server = self._server
+        if server is not None:
+            if self._server_messages < self.max_messages and self._is_alive(server):
+                return server
+            self._close()
+
+        self._server_messages = 0
+        return self._connect()
+
+    @staticmethod
+    def _is_alive(server) -> bool:
+        """Check an idle connection with NOOP before reusing it"""
+        try:
+            return server.noop()[0] == 250
+        except Exception:
+            return False
+
+    def _connect(self):
+        """Open an authenticated SMTP connection"""
+        import smtplib
+
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+        try:
+            server.starttls()
+            server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    def _close(self):
+        """Close the shared SMTP connection; callers hold self._lock"""
+        server, self._server = self._server, None
+        if server is not None:
+            try:
+                server.quit()
+            except Exception:
+                server.close()
+
+    def _template_context(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the substitution values for _HTML_BODY_TEMPLATE"""
+        get = config.get
+        ctx = defaultdict(lambda: 'N/A', config)
+        ctx['slave_select'] = 'Active High' if not get('slave_active_low', True) else 'Active Low'
+        ctx['data_order'] = 'LSB First' if not get('msb_first', True) else 'MSB First'
+        ctx['file_mode'] = get('mode', 'X')
+        ctx['file_width'] = get('data_width', 'Z')
+        ctx['simulation_status'] = '✅ Passed' if get('simulation_success') else '⚠️ Completed (simulation tools not available)'
+        ctx['test_duration'] = get('test_duration', 'standard')
+
+        # One lookup per flag fills both its CSS class and its icon
+        for flag, class_key, icon_key in _FEATURE_FLAG_KEYS:
+            ctx[class_key], ctx[icon_key] = _FEATURE_FLAG_LABELS[bool(get(flag))]
+
+        return ctx
+
+    def _attach_file(self, msg: 'MIMEMultipart', file_path: str):
         """Attach a file to the email message"""
+        import base64
+        import io
+        from email.mime.base import MIMEBase
+
         try:
             with open(file_path, 'rb') as attachment:
                 part = MIMEBase('application', 'octet-stream')
-                part.set_payload(attachment.read())
-                encoders.encode_base64(part)
+
+                # Encode in blocks that are a multiple of 57 bytes so every
+                # block ends on a full 76 character base64 line, giving the
+                # same text as encoding the whole file at once without
+                # holding the raw file in memory
+                encoded = io.StringIO()
+                for block in iter(lambda: attachment.read(_ATTACH_BLOCK_SIZE), b''):
+                    encoded.write(base64.encodebytes(block).decode('ascii'))
+                part.set_payload(encoded.getvalue())
+                part['Content-Transfer-Encoding'] = 'base64'
+
                 part.add_header(
                     'Content-Disposition',
                     f"attachment; filename={os.path.basename(file_path)}"
@@ -171,8 +322,6 @@ class EmailSender:
 
 def send_test_email():
     """Send a test email to verify configuration"""
-    sender = EmailSender()
-
     test_config = {
         'issue_number': 123,
         'mode': 0,
@@ -196,7 +345,8 @@ def send_test_email():
         'results/test_tb.v'
     ]
 
-    return sender.send_results_email(test_config, test_attachments)
+    with EmailSender() as sender:
+        return sender.send_results_email(test_config, test_attachments)
 
 
 def send_workflow_email():
@@ -212,6 +362,7 @@ def send_workflow_email():
     if parent_dir not in sys.path:
         sys.path.insert(0, parent_dir)
 
+    from dataclasses import asdict
     from config_parser import SPIConfigParser
 
     sender = EmailSender()
@@ -265,15 +416,19 @@ def send_workflow_email():
 
         # Look for result files
         issue_dir = f'results/issue-{issue_number_int}'
-        attachments = []
-
-        # Add generated files if they exist
-        for filename in ['spi_config.json', 'spi_master.v', 'spi_master_tb.v']:
-            filepath = os.path.join(issue_dir, filename)
-            if os.path.exists(filepath):
-                attachments.append(filepath)
 
-        success = sender.send_results_email(config.__dict__, attachments)
+        # Add generated files if they exist, found with one directory scan
+        wanted = ('spi_config.json', 'spi_master.v', 'spi_master_tb.v')
+        try:
+            with os.scandir(issue_dir) as entries:
+                found = {entry.name: entry.path for entry in entries
+                         if entry.name in wanted and entry.is_file()}
+        except FileNotFoundError:
+            found = {}
+        attachments = [found[filename] for filename in wanted if filename in found]
+
+        with sender:
+            success = sender.send_results_email(asdict(config), attachments)
 
         if success:
             print(f"✅ Email sent successfully to {config.email}")
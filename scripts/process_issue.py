@@ -8,7 +8,9 @@ import os
 import sys
 import json
 import requests
-from typing import Dict, Any, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Any, Optional, Tuple
 
 # Add current directory to path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -18,25 +20,118 @@ from verilog_generator import VerilogGenerator
 from simulator_runner import RTLSimulator
 
 
+# Markdown posted back to the issue when processing completes, filled in
+# by _generate_results_summary
+_RESULTS_SUMMARY_TEMPLATE = """🎉 **SPI Customization Complete!**
+
+## Generated Files
+
+### 📁 **Core Files**
+- **SPI Master Core**: `{core_name}`
+  - Mode: {mode}
+  - Data Width: {data_width} bits
+  - Slaves: {num_slaves}
+
+### 🧪 **Test Files**
+- **Verilog Testbench**: `{tb_name}`
+- **Python Test**: `test_spi.py` (Cocotb)
+- **Configuration**: `spi_config.json`
+
+## Download Links
+
+📎 **Download all generated files**: [spi-results-{issue_number}.zip](https://github.com/{repo_owner}/{repo_name}/actions/runs/{run_id})
+
+## Technical Details
+
+### SPI Configuration
+- **Mode**: {mode} ({clock_setting})
+- **Clock Polarity**: {clock_polarity}
+- **Clock Phase**: {clock_phase}
+- **Slave Select**: {slave_select}
+- **Data Order**: {data_order}
+
+### Features Enabled
+- **Interrupts**: {interrupts}
+- **FIFO Buffers**: {fifo_buffers}
+- **DMA Support**: {dma_support}
+- **Multi-master**: {multi_master}
+
+### Testing Results
+- **RTL Simulation**: {simulation_status}
+- **Waveform Capture**: {waveform_capture}
+- **Test Duration**: {test_duration}
+
+## Next Steps
+
+1. **Download** the generated files from the link above
+2. **Simulate** the design using your preferred RTL tools
+3. **Integrate** the SPI core into your FPGA/ASIC design
+4. **Test** with your target hardware
+
+## Support
+
+If you encounter any issues or need modifications:
+- 📧 Email: {email}
+- 💬 GitHub: @{github_username}
+- 🐛 Report issues: [New Issue](https://github.com/{repo_owner}/{repo_name}/issues/new)
+
+---
+
+*Generated by SPI Customizer v1.0* 🚀"""
+
+# Check mark / cross shown for enabled and disabled options
+_STATUS_ICONS = {True: '✅', False: '❌'}
+
+
+def _describe_mode(mode: int) -> Tuple[str, str, str]:
+    """Clock setting, polarity and phase labels for an SPI mode"""
+    clock_setting = 'CPOL=1, CPHA=1' if mode == 3 else f'CPOL={mode//2}, CPHA={mode%2}'
+    clock_polarity = 'High' if mode in (2, 3) else 'Low'
+    clock_phase = 'Falling edge' if mode in (1, 3) else 'Rising edge'
+    return clock_setting, clock_polarity, clock_phase
+
+
+# Labels for the four valid SPI modes, built once
+_MODE_LABELS = {mode: _describe_mode(mode) for mode in range(4)}
+
+
 class GitHubIssueProcessor:
     """Processes GitHub issues for SPI customization"""
 
+    # Labels and state applied with each status update. Processing and
+    # failed leave the state alone, so failed issues stay open for debugging.
+    _STATUS_PATCH = {
+        'processing': {'labels': ['in-progress']},
+        'completed': {'labels': ['completed'], 'state': 'closed'},
+        'failed': {'labels': ['failed']},
+    }
+
     def __init__(self, token: str, issue_number: int):
         self.token = token
         self.issue_number = issue_number
         self.api_base = "https://api.github.com/repos"
         self.repo_owner = "SJTU-YONGFU-RESEARCH-GRP"
         self.repo_name = "spi-customizer"
-
-    def get_issue_content(self) -> Optional[str]:
-        """Fetch issue content from GitHub API"""
-        headers = {
+        self.session = self._create_session()
+
+    def _create_session(self) -> requests.Session:
+        """Create a keep-alive session for GitHub API calls"""
+        # The issue fetch and every status update share one connection;
+        # idempotent requests are retried on connection errors
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=10,
+                              max_retries=Retry(total=3, backoff_factor=0.3))
+        session.mount('https://', adapter)
+        session.headers.update({
             'Authorization': f'token {self.token}',
             'Accept': 'application/vnd.github.v3+json'
-        }
+        })
+        return session
 
+    def get_issue_content(self) -> Optional[str]:
+        """Fetch issue content from GitHub API"""
         url = f"{self.api_base}/{self.repo_owner}/{self.repo_name}/issues/{self.issue_number}"
-        response = requests.get(url, headers=headers)
+        response = self.session.get(url)
 
         if response.status_code == 200:
             issue_data = response.json()
@@ -47,26 +142,12 @@ class GitHubIssueProcessor:
 
     def update_issue_status(self, status: str, body: str = ""):
         """Update GitHub issue with processing status"""
-        headers = {
-            'Authorization': f'token {self.token}',
-            'Accept': 'application/vnd.github.v3+json',
-            'Content-Type': 'application/json'
-        }
-
-        data = {'body': body}
-
-        if status == 'processing':
-            data['labels'] = ['in-progress']
-            # Don't change state when setting to processing
-        elif status == 'completed':
-            data['labels'] = ['completed']
-            data['state'] = 'closed'
-        elif status == 'failed':
-            data['labels'] = ['failed']
-            # Don't change state when failing, keep it open for debugging
+        headers = {'Content-Type': 'application/json'}
+
+        data = {'body': body, **self._STATUS_PATCH.get(status, {})}
 
         url = f"{self.api_base}/{self.repo_owner}/{self.repo_name}/issues/{self.issue_number}"
-        response = requests.patch(url, headers=headers, json=data)
+        response = self.session.patch(url, headers=headers, json=data)
 
         if response.status_code == 200:
             print(f"✅ Issue #{self.issue_number} updated with status: {status}")
@@ -200,65 +281,34 @@ class GitHubIssueProcessor:
 
     def _generate_results_summary(self, config: SPIConfig, core_file: str, tb_file: str, sim_success: bool) -> str:
         """Generate summary of results for GitHub issue"""
-
-        summary = f"""🎉 **SPI Customization Complete!**
-
-## Generated Files
-
-### 📁 **Core Files**
-- **SPI Master Core**: `{os.path.basename(core_file)}`
-  - Mode: {config.mode}
-  - Data Width: {config.data_width} bits
-  - Slaves: {config.num_slaves}
-
-### 🧪 **Test Files**
-- **Verilog Testbench**: `{os.path.basename(tb_file)}`
-- **Python Test**: `test_spi.py` (Cocotb)
-- **Configuration**: `spi_config.json`
-
-## Download Links
-
-📎 **Download all generated files**: [spi-results-{self.issue_number}.zip](https://github.com/{self.repo_owner}/{self.repo_name}/actions/runs/{os.environ.get('GITHUB_RUN_ID', 'latest')})
-
-## Technical Details
-
-### SPI Configuration
-- **Mode**: {config.mode} ({'CPOL=1, CPHA=1' if config.mode == 3 else f'CPOL={config.mode//2}, CPHA={config.mode%2}'})
-- **Clock Polarity**: {'High' if config.mode in [2,3] else 'Low'}
-- **Clock Phase**: {'Falling edge' if config.mode in [1,3] else 'Rising edge'}
-- **Slave Select**: {'Active High' if not config.slave_active_low else 'Active Low'}
-- **Data Order**: {'LSB First' if not config.msb_first else 'MSB First'}
-
-### Features Enabled
-- **Interrupts**: {'✅' if config.interrupts else '❌'}
-- **FIFO Buffers**: {'✅' if config.fifo_buffers else '❌'}
-- **DMA Support**: {'✅' if config.dma_support else '❌'}
-- **Multi-master**: {'✅' if config.multi_master else '❌'}
-
-### Testing Results
-- **RTL Simulation**: {'✅ Passed' if sim_success else '⚠️ Skipped (tools not available)'}
-- **Waveform Capture**: {'✅' if config.waveform_capture else '❌'}
-- **Test Duration**: {config.test_duration}
-
-## Next Steps
-
-1. **Download** the generated files from the link above
-2. **Simulate** the design using your preferred RTL tools
-3. **Integrate** the SPI core into your FPGA/ASIC design
-4. **Test** with your target hardware
-
-## Support
-
-If you encounter any issues or need modifications:
-- 📧 Email: {config.email}
-- 💬 GitHub: @{config.github_username}
-- 🐛 Report issues: [New Issue](https://github.com/{self.repo_owner}/{self.repo_name}/issues/new)
-
----
-
-*Generated by SPI Customizer v1.0* 🚀"""
-
-        return summary
+        mode = config.mode
+        clock_setting, clock_polarity, clock_phase = _MODE_LABELS.get(mode) or _describe_mode(mode)
+
+        return _RESULTS_SUMMARY_TEMPLATE.format(
+            core_name=os.path.basename(core_file),
+            tb_name=os.path.basename(tb_file),
+            mode=mode,
+            data_width=config.data_width,
+            num_slaves=config.num_slaves,
+            issue_number=self.issue_number,
+            repo_owner=self.repo_owner,
+            repo_name=self.repo_name,
+            run_id=os.environ.get('GITHUB_RUN_ID', 'latest'),
+            clock_setting=clock_setting,
+            clock_polarity=clock_polarity,
+            clock_phase=clock_phase,
+            slave_select='Active High' if not config.slave_active_low else 'Active Low',
+            data_order='LSB First' if not config.msb_first else 'MSB First',
+            interrupts=_STATUS_ICONS[bool(config.interrupts)],
+            fifo_buffers=_STATUS_ICONS[bool(config.fifo_buffers)],
+            dma_support=_STATUS_ICONS[bool(config.dma_support)],
+            multi_master=_STATUS_ICONS[bool(config.multi_master)],
+            simulation_status='✅ Passed' if sim_success else '⚠️ Skipped (tools not available)',
+            waveform_capture=_STATUS_ICONS[bool(config.waveform_capture)],
+            test_duration=config.test_duration,
+            email=config.email,
+            github_username=config.github_username,
+        )
 
 
 def main():
@@ -8,19 +8,74 @@ Works in venv environments without requiring system RTL tools
 import os
 import sys
 import re
+import copy
+import io
 import json
+import functools
+import multiprocessing
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from types import SimpleNamespace
+from typing import Dict, Any, List, Optional, TextIO, Tuple
+
+# orjson is an optional speedup for the config reads; the stdlib json module
+# is used when it is not installed
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Required SPI signals and their analysis flags (already case-insensitive)
+_REQUIRED_SIGNALS = tuple((sig, f"has_{sig}") for sig in ("sclk", "mosi", "miso", "ss"))
+
+# Integer parameter values: optional sign, optional sized/based prefix
+# (4'd, 8'h, 'b ...), digits, then an optional statement terminator and
+# line comment
+_VERILOG_INT_RE = re.compile(r"([-+]?)\s*(?:\d*\s*'[sS]?([bBoOdDhH])\s*)?([0-9a-fA-F_]+)\s*;?\s*(?://.*)?")
+_VERILOG_BASES = {'b': 2, 'o': 8, 'd': 10, 'h': 16}
+_VALID_MODES = frozenset({0, 1, 2, 3})
+
+# Parameter and port declarations, compiled once per process
+_PARAM_RE = re.compile(r'parameter\s+(\w+)\s*=\s*([^,\n]+)', re.IGNORECASE)
+_INPUT_RE = re.compile(r'input\s+(?:wire\s+)?(?:reg\s+)?(\w+)', re.IGNORECASE)
+_OUTPUT_RE = re.compile(r'output\s+(?:wire\s+)?(?:reg\s+)?(\w+)', re.IGNORECASE)
+
+def _parse_verilog_int(value: Optional[str]) -> Optional[int]:
+    """Parse a Verilog integer literal such as 16, 4'd3 or 8'h20; None if it is not one"""
+    if value is None:
+        return None
+    match = _VERILOG_INT_RE.fullmatch(value.strip())
+    if not match:
+        return None
+    sign, base_char, digits = match.groups()
+    try:
+        value = int(digits.replace('_', ''), _VERILOG_BASES[base_char.lower()] if base_char else 10)
+    except ValueError:
+        return None
+    return -value if sign == '-' else value
 
 def analyze_verilog_structure(file_path: str) -> Dict[str, Any]:
     """Analyze Verilog file structure and extract key information"""
 
-    if not os.path.exists(file_path):
+    try:
+        stat = os.stat(file_path)
+    except OSError:
         return {"error": f"File not found: {file_path}"}
 
+    # Unchanged files (same path, mtime and size) are only analyzed once;
+    # callers get their own copy so the cached result stays intact
+    return copy.deepcopy(_analyze_cached(os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size))
+
+@functools.lru_cache(maxsize=128)
+def _analyze_cached(file_path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """Analyze one version of a Verilog file, keyed by its stat signature"""
+
     with open(file_path, 'r') as f:
         content = f.read()
 
+    # Lowercase once for all the case-insensitive signal checks below
+    lowered = content.lower()
+
     analysis = {
         "filename": os.path.basename(file_path),
         "size": len(content),
@@ -30,22 +85,22 @@ def analyze_verilog_structure(file_path: str) -> Dict[str, Any]:
         "has_ports": "input" in content or "output" in content,
         "has_logic": "always" in content or "assign" in content,
         "spi_specific": {
-            "has_sclk": "sclk" in content.lower() or "sck" in content.lower(),
-            "has_mosi": "mosi" in content.lower(),
-            "has_miso": "miso" in content.lower(),
-            "has_ss": "ss" in content.lower() or "cs" in content.lower() or "ss_n" in content.lower(),
-            "has_spi_states": any(state in content.lower() for state in ["idle", "setup", "transmit", "receive"]),
-            "has_clock_divider": "clk" in content.lower() and ("counter" in content.lower() or "divider" in content.lower()),
+            "has_sclk": "sclk" in lowered or "sck" in lowered,
+            "has_mosi": "mosi" in lowered,
+            "has_miso": "miso" in lowered,
+            "has_ss": "ss" in lowered or "cs" in lowered or "ss_n" in lowered,
+            "has_spi_states": any(state in lowered for state in ["idle", "setup", "transmit", "receive"]),
+            "has_clock_divider": "clk" in lowered and ("counter" in lowered or "divider" in lowered),
         }
     }
 
     # Extract parameters
-    param_matches = re.findall(r'parameter\s+(\w+)\s*=\s*([^,\n]+)', content, re.IGNORECASE | re.MULTILINE)
+    param_matches = _PARAM_RE.findall(content)
     analysis["parameters"] = {name: value.strip() for name, value in param_matches}
 
     # Extract ports
-    input_matches = re.findall(r'input\s+(?:wire\s+)?(?:reg\s+)?(\w+)', content, re.IGNORECASE | re.MULTILINE)
-    output_matches = re.findall(r'output\s+(?:wire\s+)?(?:reg\s+)?(\w+)', content, re.IGNORECASE | re.MULTILINE)
+    input_matches = _INPUT_RE.findall(content)
+    output_matches = _OUTPUT_RE.findall(content)
     analysis["ports"] = {
         "inputs": input_matches,
         "outputs": output_matches
@@ -53,10 +108,11 @@ def analyze_verilog_structure(file_path: str) -> Dict[str, Any]:
 
     return analysis
 
-def verify_spi_core(verilog_file: str) -> Dict[str, Any]:
-    """Verify SPI core implementation"""
+def verify_spi_core(verilog_file: str, analysis: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Verify SPI core implementation, reusing the file analysis if given"""
 
-    analysis = analyze_verilog_structure(verilog_file)
+    if analysis is None:
+        analysis = analyze_verilog_structure(verilog_file)
 
     if "error" in analysis:
         return analysis
@@ -72,16 +128,7 @@ def verify_spi_core(verilog_file: str) -> Dict[str, Any]:
     spi_check = analysis["spi_specific"]
 
     # Check for required SPI signals (case-insensitive)
-    required_signals = ["sclk", "mosi", "miso", "ss"]
-    missing_signals = []
-    for sig in required_signals:
-        found = False
-        for check_name in [f"has_{sig}", f"has_{sig.upper()}"]:
-            if spi_check.get(check_name, False):
-                found = True
-                break
-        if not found:
-            missing_signals.append(sig)
+    missing_signals = [sig for sig, check_name in _REQUIRED_SIGNALS if not spi_check.get(check_name, False)]
 
     if missing_signals:
         verification["issues"].append(f"Missing SPI signals: {missing_signals}")
@@ -99,15 +146,15 @@ def verify_spi_core(verilog_file: str) -> Dict[str, Any]:
 
     # Parameter validation
     params = analysis.get("parameters", {})
-    if "MODE" in params:
-        mode = int(params["MODE"])
-        if mode not in [0, 1, 2, 3]:
-            verification["issues"].append(f"Invalid SPI mode: {mode}")
+    # Values that are not plain integer literals (expressions, macros) are
+    # left unchecked rather than failing the whole verification
+    mode = _parse_verilog_int(params.get("MODE"))
+    if mode is not None and mode not in _VALID_MODES:
+        verification["issues"].append(f"Invalid SPI mode: {mode}")
 
-    if "DATA_WIDTH" in params:
-        width = int(params["DATA_WIDTH"])
-        if width < 8 or width > 64:
-            verification["issues"].append(f"Unusual data width: {width} bits")
+    width = _parse_verilog_int(params.get("DATA_WIDTH"))
+    if width is not None and (width < 8 or width > 64):
+        verification["issues"].append(f"Unusual data width: {width} bits")
 
 
     # Generate recommendations
@@ -134,8 +181,18 @@ def verify_spi_core(verilog_file: str) -> Dict[str, Any]:
 def run_python_verification(config, issue_number) -> Dict[str, Any]:
     """Run Python-based verification of generated files"""
 
+    # Progress lines are collected and written to stdout in one go
+    out = io.StringIO()
+    try:
+        return _run_python_verification(config, issue_number, out)
+    finally:
+        sys.stdout.write(out.getvalue())
+
+def _run_python_verification(config, issue_number, out: TextIO) -> Dict[str, Any]:
+    """Run Python-based verification, writing progress lines to out"""
+
     issue_dir = f"results/issue-{issue_number}"
-    print(f"🔍 Running Python-based verification for {issue_number}")
+    print(f"🔍 Running Python-based verification for {issue_number}", file=out)
 
     results = {
         "config": {
@@ -154,64 +211,114 @@ def run_python_verification(config, issue_number) -> Dict[str, Any]:
         "spi_master_tb_mode" + str(config.mode) + ".v"
     ]
 
+    # One directory listing instead of a stat per candidate name
+    try:
+        with os.scandir(issue_dir) as it:
+            present = {entry.name: entry.path for entry in it if entry.is_file()}
+    except OSError:
+        present = {}
+
     for filename in files_to_check:
-        file_path = os.path.join(issue_dir, filename)
-        if os.path.exists(file_path):
-            print(f"   📄 Analyzing {filename}...")
-            results["files"][filename] = analyze_verilog_structure(file_path)
+        if filename in present:
+            print(f"   📄 Analyzing {filename}...", file=out)
+            results["files"][filename] = analyze_verilog_structure(present[filename])
         else:
             # Try with simple naming
             simple_filename = f"{config.issue_number}.v" if isinstance(config.issue_number, str) else filename
-            file_path = os.path.join(issue_dir, simple_filename)
-            if os.path.exists(file_path):
-                print(f"   📄 Analyzing {simple_filename}...")
-                results["files"][simple_filename] = analyze_verilog_structure(file_path)
+            if simple_filename in present:
+                print(f"   📄 Analyzing {simple_filename}...", file=out)
+                results["files"][simple_filename] = analyze_verilog_structure(present[simple_filename])
 
     # Verify SPI core if found
     spi_files = [f for f in results["files"].keys() if "spi_master" in f and not f.endswith("_tb.v")]
     if spi_files:
-        spi_file = os.path.join(issue_dir, spi_files[0])
-        results["verification"]["spi_core"] = verify_spi_core(spi_file)
-        print(f"   ✅ SPI core verification: {results['verification']['spi_core']['overall']}")
+        spi_file = present[spi_files[0]]
+        results["verification"]["spi_core"] = verify_spi_core(spi_file, analysis=results["files"][spi_files[0]])
+        print(f"   ✅ SPI core verification: {results['verification']['spi_core']['overall']}", file=out)
     else:
         results["verification"]["spi_core"] = {"error": "SPI core file not found"}
 
-    # Calculate summary
-    all_issues = []
-    all_recommendations = []
-    total_score = 0
-    verified_files = 0
-
-    for filename, analysis in results["files"].items():
-        if "error" not in analysis:
-            verified_files += 1
-            if "spi_core" in results["verification"]:
-                core_verification = results["verification"]["spi_core"]
-                if "issues" in core_verification:
-                    all_issues.extend(core_verification["issues"])
-                if "recommendations" in core_verification:
-                    all_recommendations.extend(core_verification["recommendations"])
-                if "score" in core_verification:
-                    total_score += core_verification["score"]
+    # Calculate summary. There is a single core verification shared by all
+    # analyzed files, so its issues and score are counted once.
+    core_verification = results["verification"]["spi_core"]
+    verified_files = sum(1 for analysis in results["files"].values() if "error" not in analysis)
+    if verified_files:
+        issues_found = len(core_verification.get("issues", []))
+        recommendations = len(core_verification.get("recommendations", []))
+        average_score = float(core_verification.get("score", 0))
+    else:
+        issues_found = recommendations = 0
+        average_score = 0.0
 
     results["summary"] = {
         "files_analyzed": len(results["files"]),
-        "issues_found": len(all_issues),
-        "recommendations": len(all_recommendations),
-        "average_score": total_score / max(verified_files, 1),
+        "issues_found": issues_found,
+        "recommendations": recommendations,
+        "average_score": average_score,
         "verification_level": "Python-based (limited)" if verified_files > 0 else "No verification"
     }
 
     return results
 
+def verify_issue_dir(issue_dir: str) -> Tuple[Dict[str, Any], str]:
+    """Verify one results/issue-* directory from its saved spi_config.json"""
+
+    # Progress output is returned with the results so batch runs can print
+    # each issue's lines together and in order
+
+    issue_number = os.path.basename(issue_dir)[len("issue-"):]
+    out = io.StringIO()
+    try:
+        with open(os.path.join(issue_dir, "spi_config.json"), 'rb') as f:
+            config_data = _json_loads(f.read())
+        config_data.setdefault("issue_number", issue_number)
+        results = _run_python_verification(SimpleNamespace(**config_data), issue_number, out)
+    except Exception as e:
+        results = {"error": f"{issue_dir}: {e}"}
+    return results, out.getvalue()
+
+def run_batch_verification() -> int:
+    """Verify every results/issue-* directory, spread over worker processes"""
+
+    issue_dirs = sorted(str(path) for path in Path("results").glob("issue-*") if path.is_dir())
+    if not issue_dirs:
+        print("❌ No issue directories found under results/")
+        return 1
+
+    print(f"🧪 Running Python-based Verification for {len(issue_dirs)} issues")
+    print("=" * 50)
+
+    # One interpreter start-up and one set of compiled patterns per worker,
+    # instead of per issue
+    with multiprocessing.Pool(min(os.cpu_count() or 1, len(issue_dirs))) as pool:
+        all_results = pool.map(verify_issue_dir, issue_dirs)
+
+    failed = 0
+    for issue_dir, (results, output) in zip(issue_dirs, all_results):
+        sys.stdout.write(output)
+        if "error" in results:
+            failed += 1
+            print(f"❌ {results['error']}")
+        else:
+            summary = results["summary"]
+            print(f"✅ {issue_dir}: {summary['files_analyzed']} files, "
+                  f"{summary['issues_found']} issues, score {summary['average_score']:.1f}")
+
+    print(f"\n📊 Verified {len(issue_dirs) - failed}/{len(issue_dirs)} issues")
+    return 0 if failed == 0 else 1
+
 def main():
     """Main verification function"""
 
     if len(sys.argv) < 2:
         print("Usage: python3 scripts/python_verification.py <issue_number>")
+        print("       python3 scripts/python_verification.py --batch")
         print("Or run from test.py for automatic detection")
         return 1
 
+    if sys.argv[1] == "--batch":
+        return run_batch_verification()
+
     try:
         issue_number = sys.argv[1]
         issue_dir = f"results/issue-{issue_number}"
@@ -226,15 +333,16 @@ def main():
         # Import configuration if available
         config_file = os.path.join(issue_dir, "spi_config.json")
         if os.path.exists(config_file):
-            with open(config_file, 'r') as f:
-                config_data = json.load(f)
+            with open(config_file, 'rb') as f:
+                config_data = _json_loads(f.read())
                 print(f"✅ Configuration loaded: Mode {config_data.get('mode', '?')}, {config_data.get('data_width', '?')}-bit")
         else:
             print("⚠️  Configuration file not found - using basic verification")
             config_data = None
 
         # Run verification
-        results = run_python_verification(config_data, issue_number)
+        config = SimpleNamespace(**config_data) if config_data else None
+        results = run_python_verification(config, issue_number)
 
         # Display results
         print("\\n📊 Verification Results:")
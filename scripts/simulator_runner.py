@@ -5,10 +5,16 @@ Compiles and runs Verilog simulation using Icarus Verilog and Cocotb
 """
 
 import os
+import hashlib
+import contextlib
+import io
+import functools
 import subprocess
 import shutil
 import sys
+import threading
 from pathlib import Path
+from typing import Dict, Optional, Tuple
 
 # Add current directory to path for imports (must be before any relative imports)
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -19,38 +25,193 @@ if parent_dir not in sys.path:
 from scripts.config_parser import SPIConfig
 
 
+# Compiled iverilog outputs, keyed by a hash of the input sources
+_SIM_CACHE_DIR = '.sim_cache'
+
+# Cocotb test written by create_cocotb_test, filled in with str.format
+_COCOTB_TEMPLATE = '''import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import Timer, RisingEdge, FallingEdge
+import random
+
+@cocotb.test()
+async def test_spi_transmission(dut):
+    """Test SPI master transmission"""
+
+    # Create clock
+    clock = Clock(dut.clk, 20, units="ns")  # 50MHz clock
+    cocotb.start_soon(clock.start())
+
+    # Reset
+    dut.rst_n.value = 0
+    await Timer(100, units="ns")
+    dut.rst_n.value = 1
+    await Timer(100, units="ns")
+
+    # Test data
+    test_data = {test_data}  # Pattern based on data width
+    dut.tx_data.value = test_data
+    dut.miso.value = 0x5A5A5A5A  # Response pattern
+
+    # Start transmission
+    dut.start_tx.value = 1
+    await Timer(20, units="ns")
+    dut.start_tx.value = 0
+
+    # Wait for completion
+    while dut.busy.value == 1:
+        await Timer(100, units="ns")
+
+    # Check results
+    await Timer(100, units="ns")
+
+    # Verify slave select was activated
+    assert dut.ss_n.value == 0, "Slave select should be active"
+
+    # Verify interrupt was generated
+    assert dut.irq.value == 1, "Interrupt should be generated"
+
+    print(f"✅ SPI transmission test passed for {data_width}-bit data: 0x{data_str}")
+'''
+
+# Header and initial dump of the simulated VCD written by _write_realistic_vcd;
+# signal changes follow, each on its own line
+_VCD_HEADER = "\n".join([
+    "$date",
+    "    Today",
+    "$end",
+    "$version",
+    "    Icarus Verilog",
+    "$end",
+    "$timescale 1ns $end",
+    "",
+    "$scope module spi_master_tb $end",
+
+    # Signal definitions
+    "$var wire 1 ! sclk $end",      # SCLK
+    "$var wire 1 \" mosi $end",     # MOSI
+    "$var wire 1 # miso $end",      # MISO
+    "$var wire 1 $ ss_n $end",      # Slave Select
+    "$var wire 1 % busy $end",      # Busy
+    "$var wire 1 & irq $end",       # Interrupt
+    "$var wire 8 ' data $end",      # Data bus
+
+    "$upscope $end",
+    "$enddefinitions $end",
+    "",
+
+    # Initial dump
+    "$dumpvars",
+    "x!",
+    "x\"",
+    "x#",
+    "1$",
+    "x%",
+    "x&",
+    "x'",
+    "$end",
+    "",
+]).encode()
+
+# VCD value-change lines, indexed by signal value, so the hot loop does no
+# string formatting for signal values
+_SCLK_CHANGES = ("\n0!", "\n1!")
+_MOSI_CHANGES = ("\n0\"", "\n1\"")
+_MISO_CHANGES = ("\n0#", "\n1#")
+_SS_N_CHANGES = ("\n0$", "\n1$")
+_BUSY_CHANGES = ("\n0%", "\n1%")
+_IRQ_CHANGES = ("\n0&", "\n1&")
+_DATA_CHANGES = tuple(f"\nb{value:08b}'" for value in range(256))
+
+# Upper bound on Verilator simulation threads (SPI_SIMULATOR=verilator)
+_VERILATOR_MAX_THREADS = 4
+
+# Userspace buffer for the simulation log, which receives vvp output line by line
+_LOG_WRITE_BUFFER = 1 << 16
+
+
+# GTKWave save file written next to each VCD
+_GTKW_TEMPLATE = "[*\n[*]\n[sst]\n{vcd}\n[timeline] 1\n[analog] 0\n[waves] 0\n"
+
+
+@functools.lru_cache(maxsize=None)
+def _find_tool(name: str) -> Optional[str]:
+    """Resolve an RTL tool on PATH or in the usual install locations, once per process"""
+    if shutil.which(name):
+        return name
+    for path in (os.path.expanduser(f'~/yongfu/local/bin/{name}'), f'/usr/local/bin/{name}', f'/usr/bin/{name}'):
+        if os.path.exists(path):
+            return path
+    return None
+
+
+@contextlib.contextmanager
+def _atomic_open(path: str, mode: str, **kwargs):
+    """Open a temporary file that replaces path only once it is fully written"""
+    # Readers (GTKWave, the CSV step, parallel workers) never see a partial file
+    tmp_file = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_file, mode, **kwargs) as f:
+            yield f
+        os.replace(tmp_file, path)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+
+def _is_native_executable(path: str) -> bool:
+    """True for a compiled simulator binary, False for vvp scripts and mock files"""
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(2)
+    except OSError:
+        return False
+    return os.access(path, os.X_OK) and not header.startswith(b'#')
+
+
+@functools.lru_cache(maxsize=None)
+def _cocotb_test_source(data_width: int) -> str:
+    """Cocotb test source for a data width; only the width varies per config"""
+    # Test data pattern based on data width
+    if data_width == 8:
+        test_data, data_str = "0xA5", "A5"
+    elif data_width == 16:
+        test_data, data_str = "0xA5A5", "A5A5"
+    else:
+        test_data, data_str = "0xA5A5A5A5", "A5A5A5A5"
+
+    return _COCOTB_TEMPLATE.format(test_data=test_data, data_width=data_width, data_str=data_str)
+
+
+@functools.lru_cache(maxsize=32)
+def _gtkw_bytes(vcd_ref: str) -> bytes:
+    """Encoded GTKWave save file pointing at a VCD file name or path"""
+    return _GTKW_TEMPLATE.format(vcd=vcd_ref).encode()
+
+
 class RTLSimulator:
     """Runs RTL simulation with Icarus Verilog and Cocotb"""
 
+    # Simulated VCD content by (total_time, num_points), shared by every
+    # simulator in the process
+    _reference_vcds: Dict[Tuple[int, int], bytes] = {}
+
     def __init__(self, results_dir: str = "results"):
         self.results_dir = Path(results_dir)
         self.results_dir.mkdir(exist_ok=True)
 
+    def _issue_dir(self, config) -> Path:
+        """Results directory for the config's issue, created if missing"""
+        if not hasattr(config, 'issue_number'):
+            return self.results_dir
+        issue_dir = self.results_dir / f"issue-{config.issue_number}"
+        issue_dir.mkdir(parents=True, exist_ok=True)
+        return issue_dir
+
     def check_dependencies(self) -> bool:
         """Check if required tools are installed"""
-        # Check for iverilog with multiple possible paths
-        iverilog_paths = [
-            'iverilog',  # Standard path
-            os.path.expanduser('~/yongfu/local/bin/iverilog'),  # User's specific path
-            '/usr/local/bin/iverilog',  # Common install location
-            '/usr/bin/iverilog'  # System path
-        ]
-
-        iverilog_found = False
-        for path in iverilog_paths:
-            if os.path.exists(path) or shutil.which('iverilog'):
-                iverilog_found = True
-                break
-
-        required_tools = ['vvp']  # Only vvp is required, we generate VCD ourselves
-        missing_tools = []
-
-        for tool in required_tools:
-            if not shutil.which(tool):
-                missing_tools.append(tool)
-
-        if not iverilog_found:
-            missing_tools.append('iverilog')
+        # GTKWave is not needed, we generate VCD ourselves
+        missing_tools = [tool for tool in ('vvp', 'iverilog') if _find_tool(tool) is None]
 
         if missing_tools:
             print(f"❌ Missing required tools: {', '.join(missing_tools)}")
@@ -77,78 +238,182 @@ class RTLSimulator:
 
         print(f"🔨 Compiling {len(verilog_files)} Verilog files...")
 
-        # Find iverilog with multiple possible paths
-        iverilog_paths = [
-            'iverilog',
-            os.path.expanduser('~/yongfu/local/bin/iverilog'),
-            '/usr/local/bin/iverilog',
-            '/usr/bin/iverilog'
-        ]
+        # Opt-in multi-threaded Verilator build, with Icarus as the fallback
+        if os.environ.get('SPI_SIMULATOR', '').lower() == 'verilator':
+            if _find_tool('verilator') and self.compile_design_verilator(verilog_files, top_module, config):
+                return True
+            print("⚠️  Verilator build unavailable - falling back to Icarus Verilog")
 
-        iverilog_cmd = None
-        for path in iverilog_paths:
-            if os.path.exists(path):
-                iverilog_cmd = path
-                break
-            elif shutil.which('iverilog'):
-                iverilog_cmd = 'iverilog'
-                break
+        iverilog_cmd = _find_tool('iverilog')
 
         if iverilog_cmd:
             print(f"   Using real Icarus Verilog compiler: {iverilog_cmd}")
 
             # Generate issue-specific directory
-            issue_dir = self.results_dir / f"issue-{config.issue_number}" if hasattr(config, 'issue_number') else self.results_dir
-            issue_dir.mkdir(exist_ok=True)
+            issue_dir = self._issue_dir(config)
 
             # Compile to issue-specific directory
             simulation_file = str(issue_dir / 'spi_simulation')
-            cmd = [iverilog_cmd, '-o', simulation_file]
-            cmd.extend(verilog_files)
 
-            try:
-                print(f"   Running: {' '.join(cmd)}")
-                print(f"   Working directory: {os.getcwd()}")
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    cwd=os.getcwd()  # Use project root as working directory
-                )
-
-                if result.returncode == 0:
-                    print("✅ Real compilation successful")
+            # Reuse a previous build of byte-identical sources
+            cached_file = self._cached_simulation_path(verilog_files)
+            if cached_file is not None:
+                if cached_file.exists():
+                    self._restore_simulation(cached_file, simulation_file)
+                    print(f"✅ Reusing cached compilation: {cached_file}")
                     print(f"   Generated: {simulation_file}")
 
-                    # Generate compilation log in issue directory
                     log_file = str(issue_dir / 'compilation.log')
                     with open(log_file, 'w') as f:
                         f.write("Icarus Verilog compilation log\n")
                         f.write("=" * 50 + "\n")
-                        f.write(f"Command: {' '.join(cmd)}\n")
-                        f.write(f"Working directory: {os.getcwd()}\n")
-                        f.write(f"Return code: {result.returncode}\n")
-                        if result.stdout:
-                            f.write(f"STDOUT:\n{result.stdout}\n")
-                        if result.stderr:
-                            f.write(f"STDERR:\n{result.stderr}\n")
+                        f.write(f"Cached build: {cached_file}\n")
+                        f.write("Compilation: SUCCESS (cached)\n")
+                    return True
+
+            # Parallel workers may compile the same sources, so each builds
+            # into its own file and only a finished build enters the cache
+            if cached_file is not None:
+                output_file = f"{cached_file}.{os.getpid()}.tmp"
+            else:
+                output_file = simulation_file
+            cmd = [iverilog_cmd, '-o', output_file]
+            cmd.extend(verilog_files)
+
+            try:
+                print(f"   Running: {' '.join(cmd)}")
+                print(f"   Working directory: {os.getcwd()}")
+
+                # Compiler output goes straight into the log in the issue
+                # directory rather than through Python memory
+                log_file = str(issue_dir / 'compilation.log')
+                with open(log_file, 'w') as f:
+                    f.write("Icarus Verilog compilation log\n")
+                    f.write("=" * 50 + "\n")
+                    f.write(f"Command: {' '.join(cmd)}\n")
+                    f.write(f"Working directory: {os.getcwd()}\n")
+                    f.write("OUTPUT:\n")
+                    f.flush()
+                    output_start = f.tell()
+                    result = subprocess.run(
+                        cmd,
+                        stdout=f,
+                        stderr=subprocess.STDOUT,
+                        cwd=os.getcwd()  # Use project root as working directory
+                    )
+                    # iverilog shares the file offset, so this is where its output ends
+                    output_end = f.tell()
+                    f.write(f"Return code: {result.returncode}\n")
+                    if result.returncode == 0:
                         f.write("Compilation: SUCCESS\n")
 
+                if result.returncode == 0:
+                    if cached_file is not None:
+                        os.replace(output_file, cached_file)
+                        self._restore_simulation(cached_file, simulation_file)
+                    print("✅ Real compilation successful")
+                    print(f"   Generated: {simulation_file}")
                     print(f"✅ Compilation log: {log_file}")
                     return True
                 else:
                     print(f"❌ Real compilation failed with exit code {result.returncode}")
-                    print("STDERR:")
-                    print(result.stderr)
+                    # The simulated fallback replaces the log, so show the
+                    # compiler output now
+                    print("OUTPUT:")
+                    with open(log_file, 'rb') as f:
+                        f.seek(output_start)
+                        print(f.read(output_end - output_start).decode(errors='replace'))
                     return self._simulate_compilation(verilog_files, top_module, config)
 
             except Exception as e:
                 print(f"❌ Real compilation error: {e}")
                 return self._simulate_compilation(verilog_files, top_module, config)
+            finally:
+                if output_file != simulation_file and os.path.exists(output_file):
+                    os.remove(output_file)
         else:
             print("   Icarus Verilog not found - simulating compilation...")
             return self._simulate_compilation(verilog_files, top_module, config)
 
+    def compile_design_verilator(self, verilog_files: list, top_module: str, config=None) -> bool:
+        """
+        Build the design into a native multi-threaded simulator with Verilator
+
+        Args:
+            verilog_files: List of Verilog file paths
+            top_module: Name of the top-level module
+            config: SPI configuration (optional)
+
+        Returns:
+            True if the build succeeded
+        """
+        issue_dir = self._issue_dir(config)
+        simulation_file = str(issue_dir / 'spi_simulation')
+        build_dir = issue_dir / 'obj_dir'
+
+        # Small models gain little beyond 4 simulation threads
+        jobs = os.cpu_count() or 1
+        threads = min(jobs, _VERILATOR_MAX_THREADS)
+
+        # Like iverilog, let Verilator pick the top module (the testbench)
+        cmd = [
+            _find_tool('verilator'), '--binary', '--trace', '-Wno-fatal',
+            '-j', str(jobs), '--threads', str(threads),
+            '--Mdir', str(build_dir), '-o', 'spi_simulation'
+        ]
+        cmd.extend(verilog_files)
+
+        try:
+            print(f"   Running: {' '.join(cmd)}")
+            log_file = str(issue_dir / 'compilation.log')
+            with open(log_file, 'w') as f:
+                f.write("Verilator compilation log\n")
+                f.write("=" * 50 + "\n")
+                f.write(f"Command: {' '.join(cmd)}\n")
+                f.write(f"Working directory: {os.getcwd()}\n")
+                f.write("OUTPUT:\n")
+                f.flush()
+                result = subprocess.run(cmd, stdout=f, stderr=subprocess.STDOUT, cwd=os.getcwd())
+                f.write(f"Return code: {result.returncode}\n")
+
+            if result.returncode != 0:
+                print(f"❌ Verilator build failed with exit code {result.returncode}")
+                print(f"📝 Compilation log: {log_file}")
+                return False
+
+            if os.path.lexists(simulation_file):
+                os.remove(simulation_file)
+            shutil.copy2(build_dir / 'spi_simulation', simulation_file)
+            print(f"✅ Verilator build successful ({threads} threads)")
+            print(f"   Generated: {simulation_file}")
+            print(f"✅ Compilation log: {log_file}")
+            return True
+
+        except Exception as e:
+            print(f"❌ Verilator build error: {e}")
+            return False
+
+    def _cached_simulation_path(self, verilog_files: list):
+        """Cache path for the compiled sources, or None if they can't be read"""
+        digest = hashlib.blake2b(digest_size=8)
+        try:
+            for path in verilog_files:
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+                digest.update(b'\0')
+        except OSError:
+            return None
+
+        cache_dir = self.results_dir / _SIM_CACHE_DIR
+        cache_dir.mkdir(exist_ok=True)
+        return cache_dir / f"spi_sim_{digest.hexdigest()}"
+
+    def _restore_simulation(self, cached_file: Path, simulation_file: str):
+        """Copy a cached build to simulation_file"""
+        # A copy rather than a link: the mock compiler rewrites
+        # simulation_file in place and must not touch the cache
+        shutil.copyfile(cached_file, simulation_file)
+
     def _simulate_compilation(self, verilog_files: list, top_module: str, config=None) -> bool:
         """
         Simulate compilation process and create mock simulation file
@@ -165,14 +430,9 @@ class RTLSimulator:
 
         try:
             # Generate issue-specific directory
-            if config and hasattr(config, 'issue_number'):
-                issue_dir = self.results_dir / f"issue-{config.issue_number}"
-                issue_dir.mkdir(exist_ok=True)
-                simulation_file = str(issue_dir / 'spi_simulation')
-                log_file = str(issue_dir / 'compilation.log')
-            else:
-                simulation_file = str(self.results_dir / 'spi_simulation')
-                log_file = str(self.results_dir / 'compilation.log')
+            issue_dir = self._issue_dir(config)
+            simulation_file = str(issue_dir / 'spi_simulation')
+            log_file = str(issue_dir / 'compilation.log')
 
             # Create mock simulation file
             with open(simulation_file, 'w') as f:
@@ -182,7 +442,7 @@ class RTLSimulator:
                 f.write("# This is a simulated compilation for environments without iverilog\n")
 
             # Generate compilation log
-            with open(log_file, 'w') as f:
+            with _atomic_open(log_file, 'w') as f:
                 f.write("Icarus Verilog compilation log\n")
                 f.write("=" * 50 + "\n")
                 f.write("Simulated compilation (iverilog not available)\n")
@@ -224,145 +484,90 @@ class RTLSimulator:
 
         # Check if we have compiled simulation (from real iverilog)
         # Try issue-specific directory first, then root directory
-        issue_dir = None
-        if hasattr(config, 'issue_number'):
-            issue_dir = self.results_dir / f"issue-{config.issue_number}"
-            simulation_file = str(issue_dir / 'spi_simulation')
-            if not os.path.exists(simulation_file):
-                simulation_file = str(self.results_dir / 'spi_simulation')
-        else:
+        issue_dir = self._issue_dir(config)
+        simulation_file = str(issue_dir / 'spi_simulation')
+        if not os.path.exists(simulation_file):
             simulation_file = str(self.results_dir / 'spi_simulation')
-            issue_dir = self.results_dir
 
         if os.path.exists(simulation_file):
-            # Find vvp with multiple possible paths
-            vvp_paths = [
-                'vvp',
-                os.path.expanduser('~/yongfu/local/bin/vvp'),
-                '/usr/local/bin/vvp',
-                '/usr/bin/vvp'
-            ]
-
-            vvp_cmd = None
-            for path in vvp_paths:
-                if os.path.exists(path) or shutil.which('vvp'):
-                    vvp_cmd = 'vvp'
-                    break
-
-            if vvp_cmd:
-                # Find vvp with multiple possible paths
-                vvp_paths = [
-                    'vvp',
-                    os.path.expanduser('~/yongfu/local/bin/vvp'),
-                    '/usr/local/bin/vvp',
-                    '/usr/bin/vvp'
-                ]
-
-                vvp_exec = None
-                for path in vvp_paths:
-                    if os.path.exists(path):
-                        vvp_exec = path
-                        break
-
-                if vvp_exec:
-                    # Ensure issue directory exists
-                    if issue_dir:
-                        issue_dir.mkdir(exist_ok=True)
-
-                    # Run real RTL simulation with VCD dumping
-                    vcd_file = str(issue_dir / 'spi_waveform.vcd')
-                    simulation_file = str(issue_dir / 'spi_simulation')
-                    cmd = [vvp_exec, '-n', simulation_file]
-
-                    try:
-                        print(f"🔧 Running real RTL simulation: {' '.join(cmd)}")
-                        print(f"   Simulation time: {sim_time}")
-                        print(f"   VCD output: {vcd_file}")
+            # Verilator builds are native executables; Icarus builds run under vvp
+            native_build = _is_native_executable(simulation_file)
+            vvp_exec = None if native_build else _find_tool('vvp')
+            if native_build or vvp_exec:
+                # Run real RTL simulation with VCD dumping
+                vcd_file = str(issue_dir / 'spi_waveform.vcd')
+                simulation_file = str(issue_dir / 'spi_simulation')
+                cmd = [os.path.abspath(simulation_file)] if native_build else [vvp_exec, '-n', simulation_file]
+
+                try:
+                    print(f"🔧 Running real RTL simulation: {' '.join(cmd)}")
+                    print(f"   Simulation time: {sim_time}")
+                    print(f"   VCD output: {vcd_file}")
+                    if vvp_exec:
                         print(f"   Using vvp: {vvp_exec}")
 
-                        # Generate simulation log header in issue directory
-                        log_file = str(issue_dir / 'simulation.log')
-                        with open(log_file, 'w') as f:
-                            f.write("Icarus Verilog simulation log\n")
-                            f.write("=" * 50 + "\n")
-                            f.write(f"Command: {' '.join(cmd)}\n")
-                            f.write(f"Simulation time: {sim_time}\n")
-                            f.write(f"VCD file: {vcd_file}\n")
-                            f.write(f"Start time: {os.getcwd()}\n\n")
-
-                        result = subprocess.run(
-                            cmd,
-                            capture_output=True,
-                            text=True,
-                            timeout=900,  # 900 second timeout for comprehensive tests
-                            env={**os.environ, 'VCD_FILE': vcd_file}
-                        )
-
-                        # Append results to log
-                        with open(log_file, 'a') as f:
-                            f.write(f"Return code: {result.returncode}\n")
-                            if result.stdout:
-                                f.write(f"STDOUT:\n{result.stdout}\n")
-                            if result.stderr:
-                                f.write(f"STDERR:\n{result.stderr}\n")
-
-                        if result.returncode == 0:
-                            print("✅ RTL Simulation completed successfully")
-                            print("📊 Simulation output:")
-                            print(result.stdout)
-
-                            # Check if VCD file was generated
-                            if os.path.exists(vcd_file):
-                                print(f"📊 Real VCD file generated: {vcd_file}")
-                                print(f"   Size: {os.path.getsize(vcd_file)} bytes")
-                                print(f"✅ Simulation log: {log_file}")
-
-                                # Generate GTKWave save file
-                                gtkw_file = str(issue_dir / 'spi_waveform.gtkw')
-                                with open(gtkw_file, 'w') as f:
-                                    f.write("[*\n")
-                                    f.write("[*]\n")
-                                    f.write("[sst]\n")
-                                    f.write(f"{issue_dir / 'spi_waveform.vcd'}\n")
-                                    f.write("[timeline] 1\n")
-                                    f.write("[analog] 0\n")
-                                    f.write("[waves] 0\n")
-                                print(f"✅ GTKWave save file: {gtkw_file}")
-
-                            return True
-                        else:
-                            print("⚠️  VCD file not found - generating simulated data")
-                            return self._generate_simulated_vcd(vcd_file, test_duration)
-                        print(f"❌ RTL Simulation failed with exit code {result.returncode}")
-                        print("STDERR:")
-                        print(result.stderr)
-                        print(f"📝 Simulation log: {log_file}")
-                        print("🔄 Falling back to simulated VCD generation...")
+                    # Generate simulation log header in issue directory
+                    log_file = str(issue_dir / 'simulation.log')
+                    with open(log_file, 'w') as f:
+                        f.write("Verilator simulation log\n" if native_build else "Icarus Verilog simulation log\n")
+                        f.write("=" * 50 + "\n")
+                        f.write(f"Command: {' '.join(cmd)}\n")
+                        f.write(f"Simulation time: {sim_time}\n")
+                        f.write(f"VCD file: {vcd_file}\n")
+                        f.write(f"Start time: {os.getcwd()}\n\n")
+
+                    # Stream vvp output to the console and log as it is
+                    # produced; comprehensive runs can print far more
+                    # $monitor output than is worth holding in memory
+                    # The VCD path is fixed by $dumpfile in the testbench, so
+                    # vvp simply inherits this process's environment
+                    returncode = self._stream_simulation(
+                        cmd, log_file, timeout=900  # 900 second timeout for comprehensive tests
+                    )
+
+                    if returncode == 0:
+                        print("✅ RTL Simulation completed successfully")
+
+                        # Check if VCD file was generated
+                        if os.path.exists(vcd_file):
+                            print(f"📊 Real VCD file generated: {vcd_file}")
+                            print(f"   Size: {os.path.getsize(vcd_file)} bytes")
+                            print(f"✅ Simulation log: {log_file}")
+
+                            # Generate GTKWave save file
+                            gtkw_file = str(issue_dir / 'spi_waveform.gtkw')
+                            with open(gtkw_file, 'wb') as f:
+                                f.write(_gtkw_bytes(str(issue_dir / 'spi_waveform.vcd')))
+                            print(f"✅ GTKWave save file: {gtkw_file}")
+
+                        return True
+                    else:
+                        print("⚠️  VCD file not found - generating simulated data")
                         return self._generate_simulated_vcd(vcd_file, test_duration)
-
-                    except subprocess.TimeoutExpired:
-                        print("⏰ RTL Simulation timed out (900 seconds)")
-                        with open(log_file, 'a') as f:
-                            f.write("TIMEOUT: Simulation exceeded 900 seconds\n")
-                        print("❌ Real simulation failed - no fallback to fake data")
-                        return False
-                    except FileNotFoundError:
-                        print("❌ vvp execution failed")
-                        print("❌ Real simulation failed - no fallback to fake data")
-                        return False
-                else:
-                    print("❌ vvp not found - cannot run simulation")
+                    print(f"❌ RTL Simulation failed with exit code {returncode}")
+                    print(f"📝 Simulation log: {log_file}")
+                    print("🔄 Falling back to simulated VCD generation...")
+                    return self._generate_simulated_vcd(vcd_file, test_duration)
+
+                except subprocess.TimeoutExpired:
+                    print("⏰ RTL Simulation timed out (900 seconds)")
+                    with open(log_file, 'a') as f:
+                        f.write("TIMEOUT: Simulation exceeded 900 seconds\n")
                     print("❌ Real simulation failed - no fallback to fake data")
                     return False
+                except FileNotFoundError:
+                    print("❌ vvp execution failed")
+                    print("❌ Real simulation failed - no fallback to fake data")
+                    return False
+            else:
+                print("❌ vvp not found - cannot run simulation")
+                print("❌ Real simulation failed - no fallback to fake data")
+                return False
         else:
             # No compiled simulation available - fail the test
             print("❌ No compiled simulation found - real simulation required")
             print("❌ Real simulation failed - no fallback to fake data")
 
-            # Ensure issue directory exists
-            if not issue_dir:
-                issue_dir = self.results_dir
-
             log_file = str(issue_dir / 'simulation.log')
 
             # Log the failure
@@ -376,6 +581,39 @@ class RTLSimulator:
 
             return False
 
+    def _stream_simulation(self, cmd: list, log_file: str, timeout: int) -> int:
+        """Run a simulation, echoing its output to stdout and the log; returns the exit code"""
+        timed_out = threading.Event()
+
+        def kill():
+            timed_out.set()
+            proc.kill()
+
+        with open(log_file, 'a', buffering=_LOG_WRITE_BUFFER) as log, subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True
+        ) as proc:
+            # Reading stdout blocks, so the timeout is enforced by a timer
+            # that kills the process rather than by proc.wait
+            watchdog = threading.Timer(timeout, kill)
+            watchdog.start()
+            try:
+                print("📊 Simulation output:")
+                log.write("OUTPUT:\n")
+                for line in proc.stdout:
+                    sys.stdout.write(line)
+                    log.write(line)
+                returncode = proc.wait()
+            finally:
+                watchdog.cancel()
+            log.write(f"Return code: {returncode}\n")
+
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        return returncode
+
     def _generate_simulated_vcd(self, vcd_file: str, test_duration: str) -> bool:
         """
         Generate realistic VCD data based on expected SPI behavior
@@ -397,15 +635,21 @@ class RTLSimulator:
         }
         total_time, num_points = durations.get(test_duration, (100000, 500))
 
-        # Generate realistic SPI timing data
-        vcd_content = self._create_realistic_vcd_content(total_time, num_points)
-
         try:
             # Extract issue directory from VCD file path
             vcd_path = Path(vcd_file)
             issue_dir = vcd_path.parent  # Get the parent directory of the VCD file
 
-            with open(vcd_file, 'w') as f:
+            # The content depends only on the duration, so each one is
+            # generated once per process and then written in a single call
+            vcd_key = (total_time, num_points)
+            vcd_content = self._reference_vcds.get(vcd_key)
+            if vcd_content is None:
+                buf = io.BytesIO()
+                self._write_realistic_vcd(buf, total_time, num_points)
+                vcd_content = self._reference_vcds[vcd_key] = buf.getvalue()
+
+            with _atomic_open(vcd_file, 'wb') as f:
                 f.write(vcd_content)
 
             print(f"✅ Simulated VCD file generated: {vcd_file}")
@@ -415,7 +659,7 @@ class RTLSimulator:
 
             # Generate log file in the same issue directory as the VCD file
             log_file = str(issue_dir / 'simulation.log')
-            with open(log_file, 'w') as f:
+            with _atomic_open(log_file, 'w') as f:
                 f.write("Icarus Verilog simulation log\n")
                 f.write("=" * 40 + "\n")
                 f.write("VCD info: 5 txns, 500 signal events\n")
@@ -430,97 +674,62 @@ class RTLSimulator:
             print(f"❌ Failed to generate VCD file: {e}")
             return False
 
-    def _create_realistic_vcd_content(self, total_time: int, num_points: int) -> str:
-        """Create realistic VCD content based on expected SPI behavior"""
-        lines = []
-
-        # VCD header
-        lines.append("$date")
-        lines.append("    Today")
-        lines.append("$end")
-        lines.append("$version")
-        lines.append("    Icarus Verilog")
-        lines.append("$end")
-        lines.append("$timescale 1ns $end")
-        lines.append("")
-        lines.append("$scope module spi_master_tb $end")
-
-        # Signal definitions
-        lines.append("$var wire 1 ! sclk $end")      # SCLK
-        lines.append("$var wire 1 \" mosi $end")     # MOSI
-        lines.append("$var wire 1 # miso $end")      # MISO
-        lines.append("$var wire 1 $ ss_n $end")      # Slave Select
-        lines.append("$var wire 1 % busy $end")      # Busy
-        lines.append("$var wire 1 & irq $end")       # Interrupt
-        lines.append("$var wire 8 ' data $end")      # Data bus
-
-        lines.append("$upscope $end")
-        lines.append("$enddefinitions $end")
-        lines.append("")
-
-        # Initial dump
-        lines.append("$dumpvars")
-        lines.append("x!")
-        lines.append("x\"")
-        lines.append("x#")
-        lines.append("1$")
-        lines.append("x%")
-        lines.append("x&")
-        lines.append("x'")
-        lines.append("$end")
-        lines.append("")
+    def _write_realistic_vcd(self, f, total_time: int, num_points: int) -> None:
+        """Write realistic VCD content based on expected SPI behavior to a binary file"""
+        f.write(_VCD_HEADER)
 
         # Generate realistic timing data
         time_step = total_time // num_points
 
+        # Values from the previous time step; None forces the first dump
+        prev_sclk = prev_mosi = prev_miso = prev_ss_n = prev_busy = prev_irq = prev_data = None
+
         for i in range(num_points):
             current_time = i * time_step
+            timestamp = f"\n#{current_time}"
+            changes = []
 
             # Realistic SPI signal patterns
-            sclk = '1' if (i // 10) % 2 == 1 else '0'  # 10ns clock
-            mosi = '1' if i % 20 < 10 else '0'          # Data pattern
-            miso = '0' if i % 25 < 15 else '1'          # Response pattern
-            ss_n = '0' if 50 < i < 150 else '1'         # Active during transaction
-            busy = '1' if 50 < i < 175 else '0'         # Busy during transaction
-            irq = '1' if i == 175 else '0'               # IRQ at end
-            data = f"b{i % 256:08b}"                    # Data pattern
+            sclk = (i // 10) & 1                # 10ns clock
+            mosi = 1 if i % 20 < 10 else 0      # Data pattern
+            miso = 0 if i % 25 < 15 else 1      # Response pattern
+            ss_n = 0 if 50 < i < 150 else 1     # Active during transaction
+            busy = 1 if 50 < i < 175 else 0     # Busy during transaction
+            irq = 1 if i == 175 else 0          # IRQ at end
+            data = i & 0xFF                     # Data pattern
 
             # Only write changes (not every time point)
-            if i == 0 or sclk != ('1' if ((i-1) // 10) % 2 == 1 else '0'):
-                lines.append(f"#{current_time}")
-                lines.append(f"{sclk}!")
-
-            if i == 0 or mosi != ('1' if (i-1) % 20 < 10 else '0'):
-                if i > 0:
-                    lines.append(f"#{current_time}")
-                lines.append(f"{mosi}\"")
-
-            if i == 0 or miso != ('0' if (i-1) % 25 < 15 else '1'):
-                if i > 0:
-                    lines.append(f"#{current_time}")
-                lines.append(f"{miso}#")
-
-            if i == 0 or ss_n != ('0' if 50 < (i-1) < 150 else '1'):
-                if i > 0:
-                    lines.append(f"#{current_time}")
-                lines.append(f"{ss_n}$")
-
-            if i == 0 or busy != ('1' if 50 < (i-1) < 175 else '0'):
-                if i > 0:
-                    lines.append(f"#{current_time}")
-                lines.append(f"{busy}%")
-
-            if i == 0 or irq != ('1' if (i-1) == 175 else '0'):
-                if i > 0:
-                    lines.append(f"#{current_time}")
-                lines.append(f"{irq}&")
-
-            if i == 0 or data != f"b{(i-1) % 256:08b}":
-                if i > 0:
-                    lines.append(f"#{current_time}")
-                lines.append(f"{data}'")
-
-        return '\n'.join(lines)
+            if sclk != prev_sclk:
+                changes.append(_SCLK_CHANGES[sclk])
+                prev_sclk = sclk
+
+            if mosi != prev_mosi:
+                changes.append(_MOSI_CHANGES[mosi])
+                prev_mosi = mosi
+
+            if miso != prev_miso:
+                changes.append(_MISO_CHANGES[miso])
+                prev_miso = miso
+
+            if ss_n != prev_ss_n:
+                changes.append(_SS_N_CHANGES[ss_n])
+                prev_ss_n = ss_n
+
+            if busy != prev_busy:
+                changes.append(_BUSY_CHANGES[busy])
+                prev_busy = busy
+
+            if irq != prev_irq:
+                changes.append(_IRQ_CHANGES[irq])
+                prev_irq = irq
+
+            if data != prev_data:
+                changes.append(_DATA_CHANGES[data])
+                prev_data = data
+
+            # One timestamp and one write per time step that has changes
+            if changes:
+                f.write((timestamp + ''.join(changes)).encode())
 
     def generate_waveform(self, vcd_file: str = None) -> bool:
         """
@@ -545,17 +754,8 @@ class RTLSimulator:
         save_file = str(vcd_path.parent / 'spi_waveform.gtkw')
 
         # Create basic GTKWave save file
-        gtkw_content = f"""[*
-[*]
-[sst]
-{os.path.basename(vcd_file)}
-[timeline] 1
-[analog] 0
-[waves] 0
-"""
-
-        with open(save_file, 'w') as f:
-            f.write(gtkw_content)
+        with open(save_file, 'wb') as f:
+            f.write(_gtkw_bytes(os.path.basename(vcd_file)))
 
         print(f"✅ Generated GTKWave save file: {save_file}")
         return True
@@ -587,7 +787,7 @@ class RTLSimulator:
 
         # Step 3: Check for generated files in issue directory
         if hasattr(config, 'issue_number'):
-            issue_dir = self.results_dir / f"issue-{config.issue_number}"
+            issue_dir = self._issue_dir(config)
             vcd_file = str(issue_dir / 'spi_waveform.vcd')
             if os.path.exists(vcd_file):
                 self.generate_waveform(vcd_file)
@@ -611,69 +811,13 @@ class RTLSimulator:
             Path to created test file
         """
 
-        # Select appropriate test data based on data width
-        if config.data_width == 8:
-            test_data = "0xA5"
-            data_str = "A5"
-        elif config.data_width == 16:
-            test_data = "0xA5A5"
-            data_str = "A5A5"
-        else:
-            test_data = "0xA5A5A5A5"
-            data_str = "A5A5A5A5"
-
-        test_content = f'''import cocotb
-from cocotb.clock import Clock
-from cocotb.triggers import Timer, RisingEdge, FallingEdge
-import random
-
-@cocotb.test()
-async def test_spi_transmission(dut):
-    """Test SPI master transmission"""
-
-    # Create clock
-    clock = Clock(dut.clk, 20, units="ns")  # 50MHz clock
-    cocotb.start_soon(clock.start())
-
-    # Reset
-    dut.rst_n.value = 0
-    await Timer(100, units="ns")
-    dut.rst_n.value = 1
-    await Timer(100, units="ns")
-
-    # Test data
-    test_data = {test_data}  # Pattern based on data width
-    dut.tx_data.value = test_data
-    dut.miso.value = 0x5A5A5A5A  # Response pattern
-
-    # Start transmission
-    dut.start_tx.value = 1
-    await Timer(20, units="ns")
-    dut.start_tx.value = 0
-
-    # Wait for completion
-    while dut.busy.value == 1:
-        await Timer(100, units="ns")
-
-    # Check results
-    await Timer(100, units="ns")
-
-    # Verify slave select was activated
-    assert dut.ss_n.value == 0, "Slave select should be active"
-
-    # Verify interrupt was generated
-    assert dut.irq.value == 1, "Interrupt should be generated"
-
-    print(f"✅ SPI transmission test passed for {config.data_width}-bit data: 0x{data_str}")
-'''
+        test_content = _cocotb_test_source(config.data_width)
 
         # Ensure issue-specific results directory exists
-        issue_dir = self.results_dir / f'issue-{config.issue_number}'
-        issue_dir.mkdir(exist_ok=True)
+        issue_dir = self._issue_dir(config)
 
         test_file = issue_dir / 'test_spi.py'
-        with open(test_file, 'w') as f:
-            f.write(test_content)
+        test_file.write_text(test_content)
 
         print(f"✅ Created Cocotb test: {test_file}")
         return str(test_file)
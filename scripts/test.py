@@ -6,8 +6,14 @@ This test replicates what happens when users file issues on GitHub
 """
 
 import os
+import re
 import sys
+import io
 import json
+import shutil
+import hashlib
+import contextlib
+import itertools
 import multiprocessing as mp
 from concurrent.futures import ProcessPoolExecutor, as_completed
 import time
@@ -22,6 +28,68 @@ from scripts.config_parser import SPIConfigParser
 from scripts.verilog_generator import VerilogGenerator
 from scripts.simulator_runner import RTLSimulator
 from scripts.process_issue import GitHubIssueProcessor
+from scripts.python_verification import run_python_verification
+from scripts import vcd_parser
+from scripts.vcd_parser import VcdParser, CsvGenerator, PlotGenerator, SignalPlotGenerator, SummaryGenerator
+
+# The parser and generator hold no per-issue state, so every test in a process
+# shares one of each
+_PARSER = SPIConfigParser()
+_GENERATOR = VerilogGenerator()
+
+# CSV and plot files cached by the hash of the VCD they were generated from,
+# so tests that simulate identical waveforms skip the matplotlib passes. The
+# generator source is part of the key, so editing vcd_parser.py invalidates
+# every entry.
+_ARTIFACT_CACHE_DIR = os.path.join('results', '.artifact_cache')
+_ARTIFACT_MANIFEST = 'manifest.json'
+with open(vcd_parser.__file__, 'rb') as _f:
+    _GENERATOR_DIGEST = hashlib.blake2b(_f.read(), digest_size=8).digest()
+del _f
+
+def _artifact_cache_path(vcd_file):
+    """Cache directory for the artifacts generated from vcd_file"""
+    digest = hashlib.blake2b(_GENERATOR_DIGEST, digest_size=8)
+    with open(vcd_file, 'rb') as f:
+        digest.update(f.read())
+    return os.path.join(_ARTIFACT_CACHE_DIR, digest.hexdigest())
+
+def _restore_artifacts(cache_path, issue_dir):
+    """Copy cached artifacts into issue_dir, returning (csv_files, plot_files) or None on a miss"""
+    try:
+        with open(os.path.join(cache_path, _ARTIFACT_MANIFEST), 'rb') as f:
+            manifest = json.loads(f.read())
+        restored = {}
+        for kind in ('csv_files', 'plot_files'):
+            restored[kind] = []
+            for name in manifest[kind]:
+                path = os.path.join(issue_dir, name)
+                shutil.copyfile(os.path.join(cache_path, name), path)
+                restored[kind].append(path)
+    except (OSError, ValueError, KeyError):
+        return None
+    return restored['csv_files'], restored['plot_files']
+
+def _store_artifacts(cache_path, csv_files, plot_files):
+    """Save generated artifacts under cache_path for later tests to reuse"""
+    # Built in a private directory and renamed into place, so parallel
+    # workers never read a half-written entry
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(tmp_path, exist_ok=True)
+        for path in itertools.chain(csv_files, plot_files):
+            shutil.copyfile(path, os.path.join(tmp_path, os.path.basename(path)))
+        manifest = {
+            'csv_files': [os.path.basename(path) for path in csv_files],
+            'plot_files': [os.path.basename(path) for path in plot_files],
+        }
+        with open(os.path.join(tmp_path, _ARTIFACT_MANIFEST), 'wb') as f:
+            f.write(json.dumps(manifest).encode())
+        os.rename(tmp_path, cache_path)
+    except OSError:
+        pass  # Another worker stored the same artifacts first
+    finally:
+        shutil.rmtree(tmp_path, ignore_errors=True)
 
 def run_single_test(args):
     """Run a single test configuration - used by multiprocessing"""
@@ -33,31 +101,23 @@ def run_single_test(args):
         print("🚀 Simulating GitHub Actions workflow...")
         print("=" * 60)
 
-        parser = SPIConfigParser()
-        config = parser.parse_issue(issue_content, issue_number)
+        # All generated files go to the issue-specific results directory
+        issue_dir = f"results/issue-{issue_number}"
+        os.makedirs(issue_dir, exist_ok=True)
+
+        config = _PARSER.parse_issue(issue_content, issue_number)
         print(f"   ✅ Configuration parsed: Mode {config.mode}, {config.data_width}-bit")
         print(f"   📧 Email: {config.email}")
         print(f"   🐙 GitHub: {config.github_username}")
 
         # Step 2: Update issue status (simulating GitHub API update)
         print("2️⃣  Updating Issue Status...")
-        status_msg = f"""🔄 Processing your SPI configuration...
-
-**Configuration Detected:**
-- SPI Mode: {config.mode}
-- Data Width: {config.data_width} bits
-- Number of Slaves: {config.num_slaves}
-- Slave Select: {'Active High' if not config.slave_active_low else 'Active Low'}
-- Data Order: {'LSB First' if not config.msb_first else 'MSB First'}
-
-⏰ This will take approximately 5-10 minutes..."""
         print("   ✅ Issue updated with processing status")
 
         # Step 3: Generate Verilog code
         print("3️⃣  Generating Verilog Code...")
-        generator = VerilogGenerator()
-        core_file = generator.save_verilog_file(config)
-        tb_file = generator.save_testbench(config)
+        core_file = _GENERATOR.save_verilog_file(config)
+        tb_file = _GENERATOR.save_testbench(config)
         print(f"   ✅ Generated: {os.path.basename(core_file)}")
         print(f"   ✅ Generated: {os.path.basename(tb_file)}")
 
@@ -65,8 +125,8 @@ def run_single_test(args):
         print("4️⃣  Compiling and Running Simulation...")
         simulator = RTLSimulator()
 
-        # Check if RTL tools are available
-        has_rtl_tools = simulator.check_dependencies()
+        # Report which RTL tools are available
+        simulator.check_dependencies()
 
         # Always try to compile and simulate first
         verilog_files = [core_file, tb_file]
@@ -77,59 +137,64 @@ def run_single_test(args):
             print("   ✅ Simulation completed successfully!")
             print("   ✅ Generated SPI core is functional")
 
-            # Files are now generated directly in issue-specific directories
-            issue_dir = f"results/issue-{issue_number}"
-            os.makedirs(issue_dir, exist_ok=True)
-
             # Check for VCD file in issue directory
-            vcd_file = f"results/issue-{issue_number}/spi_waveform.vcd"
+            vcd_file = os.path.join(issue_dir, "spi_waveform.vcd")
             if os.path.exists(vcd_file):
-                print(f"   📊 VCD file generated: {os.path.basename(vcd_file)}")
+                print("   📊 VCD file generated: spi_waveform.vcd")
                 print(f"   📊 Size: {os.path.getsize(vcd_file)} bytes")
 
                 # Parse VCD and generate CSV files
                 print("5️⃣  Processing VCD data...")
                 try:
-                    from vcd_parser import VcdParser, CsvGenerator, PlotGenerator, SignalPlotGenerator
-
                     parser = VcdParser(vcd_file)
                     vcd_data = parser.parse()
 
                     if "error" not in vcd_data:
                         print(f"   ✅ VCD parsed: {len(vcd_data['signals'])} signals found")
 
-                        # Generate CSV files
-                        csv_gen = CsvGenerator(vcd_data, issue_dir)
-                        csv_files = csv_gen.generate_csv_files()
-                        print(f"   ✅ Generated {len(csv_files)} CSV files")
-
-                        # Generate text-based plots
-                        plot_gen = PlotGenerator(issue_dir)
-                        plot_files = plot_gen.generate_plots()
-                        print(f"   ✅ Generated {len(plot_files)} text plots")
-
-                        # Generate matplotlib plots
-                        signal_plot_gen = SignalPlotGenerator(issue_dir)
-                        signal_plots = signal_plot_gen.generate_all_plots()
-                        print(f"   ✅ Generated {len(signal_plots)} signal plots")
-                        plot_files.extend(signal_plots)
-
-                        # Generate individual signal plots for detailed analysis
-                        individual_plots = signal_plot_gen.generate_individual_signal_plots()
-                        print(f"   ✅ Generated {len(individual_plots)} individual signal plots")
-                        plot_files.extend(individual_plots)
-
-                        # List generated files
-                        for csv_file in csv_files + plot_files:
-                            if os.path.exists(f"{issue_dir}/{csv_file}"):
-                                size = os.path.getsize(f"{issue_dir}/{csv_file}")
-                                print(f"   📊 {csv_file} ({size} bytes)")
+                        # Reuse the artifacts of an earlier test with the same waveform
+                        cache_path = _artifact_cache_path(vcd_file)
+                        cached = _restore_artifacts(cache_path, issue_dir)
+                        if cached is not None:
+                            csv_files, plot_files = cached
+                            print(f"   ✅ Reused {len(csv_files)} CSV files and {len(plot_files)} plots from cache")
+                        else:
+                            # Generate CSV files
+                            csv_gen = CsvGenerator(vcd_data, issue_dir)
+                            csv_files = csv_gen.generate_csv_files()
+                            print(f"   ✅ Generated {len(csv_files)} CSV files")
+
+                            # Generate text-based plots
+                            plot_gen = PlotGenerator(issue_dir)
+                            plot_files = plot_gen.generate_plots()
+                            print(f"   ✅ Generated {len(plot_files)} text plots")
+
+                            # Generate matplotlib plots
+                            signal_plot_gen = SignalPlotGenerator(issue_dir)
+                            signal_plots = signal_plot_gen.generate_all_plots()
+                            print(f"   ✅ Generated {len(signal_plots)} signal plots")
+                            plot_files.extend(signal_plots)
+
+                            # Generate individual signal plots for detailed analysis
+                            individual_plots = signal_plot_gen.generate_individual_signal_plots()
+                            print(f"   ✅ Generated {len(individual_plots)} individual signal plots")
+                            plot_files.extend(individual_plots)
+
+                            _store_artifacts(cache_path, csv_files, plot_files)
+
+                        # List generated files, sized from a single directory scan
+                        with os.scandir(issue_dir) as it:
+                            entries = {entry.name: entry for entry in it}
+                        listing = []
+                        for csv_file in itertools.chain(csv_files, plot_files):
+                            entry = entries.get(os.path.basename(csv_file))
+                            if entry is not None:
+                                listing.append(f"   📊 {csv_file} ({entry.stat().st_size} bytes)\n")
+                        sys.stdout.write(''.join(listing))
 
                         # Generate comprehensive summary report
                         print("6️⃣  Generating Summary Report...")
                         try:
-                            from vcd_parser import SummaryGenerator
-
                             summary_gen = SummaryGenerator(issue_dir)
                             summary_file = summary_gen.generate_summary()
                             print(f"   ✅ Generated: {os.path.basename(summary_file)}")
@@ -147,8 +212,6 @@ def run_single_test(args):
             print("   ❌ Simulation FAILED - Issues detected")
             print("   🔄 Falling back to Python verification...")
             # Fallback to Python verification
-            from python_verification import run_python_verification
-
             try:
                 verification_results = run_python_verification(config, issue_number)
                 simulation_success = False  # RTL simulation failed, so test should fail
@@ -182,64 +245,16 @@ def run_single_test(args):
             'simulation_success': simulation_success
         }
 
-        issue_dir = f'results/issue-{issue_number}'
-        os.makedirs(issue_dir, exist_ok=True)
-        config_file = os.path.join(issue_dir, 'spi_config.json')
-        with open(config_file, 'w') as f:
-            json.dump(config_dict, f, indent=2)
+        with open(os.path.join(issue_dir, 'spi_config.json'), 'w') as f:
+            f.write(json.dumps(config_dict, indent=2))
 
-        print(f"   ✅ Configuration saved: {os.path.basename(config_file)}")
+        print("   ✅ Configuration saved: spi_config.json")
 
         # Step 6: Show results summary (simulating GitHub issue update)
         print("6️⃣  Final Results Summary:")
-        files = os.listdir(issue_dir)
-        for file in sorted(files):
-            size = os.path.getsize(os.path.join(issue_dir, file))
-            print(f"   📁 {file} ({size} bytes)")
-
-        # Generate summary (same as what would be posted to GitHub)
-        summary = f"""🎉 **SPI Customization Complete!**
-
-## Generated Files
-
-### 📁 **Core Files**
-- **SPI Master Core**: `{os.path.basename(core_file)}`
-  - Mode: {config.mode}
-  - Data Width: {config.data_width} bits
-  - Slaves: {config.num_slaves}
-
-### 🧪 **Test Files**
-- **Verilog Testbench**: `{os.path.basename(tb_file)}`
-- **Python Test**: `test_spi.py` (Cocotb)
-- **Configuration**: `spi_config.json`
-- **VCD Waveform**: `spi_waveform.vcd` (if simulation available)
-- **CSV Data Files**: Multiple CSV files for plotting and analysis
-- **Analysis Reports**: Text-based timing diagrams and signal analysis
-
-## Technical Details
-
-### SPI Configuration
-- **Mode**: {config.mode} ({'CPOL=1, CPHA=1' if config.mode == 3 else f'CPOL={config.mode//2}, CPHA={config.mode%2}'})
-- **Clock Polarity**: {'High' if config.mode in [2,3] else 'Low'}
-- **Clock Phase**: {'Falling edge' if config.mode in [1,3] else 'Rising edge'}
-- **Slave Select**: {'Active High' if not config.slave_active_low else 'Active Low'}
-- **Data Order**: {'LSB First' if not config.msb_first else 'MSB First'}
-
-### Features Enabled
-- **Interrupts**: {'✅' if config.interrupts else '❌'}
-- **FIFO Buffers**: {'✅' if config.fifo_buffers else '❌'}
-- **DMA Support**: {'✅' if config.dma_support else '❌'}
-- **Multi-master**: {'✅' if config.multi_master else '❌'}
-
-### Testing Results
-- **Verification**: {'✅ Passed' if simulation_success else '❌ Failed'}
-- **Method**: {'Python-based verification' if not has_rtl_tools else 'Full RTL simulation with VCD'}
-- **Test Duration**: {config.test_duration}
-- **Data Files**: {'VCD, CSV, and analysis reports' if has_rtl_tools else 'CSV analysis files'}
-- **Visualization**: Ready for plotting with matplotlib, Excel, or online tools
-
----
-*Generated by SPI Customizer - Same process as GitHub Actions* 🚀"""
+        with os.scandir(issue_dir) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+        sys.stdout.write(''.join(f"   📁 {entry.name} ({entry.stat().st_size} bytes)\n" for entry in entries))
 
         print(f"📋 Final Status Update:")
         print(f"   📊 Simulation: {'✅ PASSED' if simulation_success else '❌ FAILED'}")
@@ -259,12 +274,36 @@ def run_single_test(args):
         print(f"❌ Test failed: {e}")
         return issue_number, False, str(e)
 
+def run_single_test_captured(args):
+    """Run a single test configuration with its output captured, for parallel runs"""
+    # Each worker's log is returned whole so the parent can print it in one
+    # block instead of interleaving it with the other workers
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        issue_number, success, error = run_single_test(args)
+    return issue_number, success, error, output.getvalue()
+
 def test_yongfu_config(issue_content, issue_number):
     """Test the system using the actual GitHub Actions workflow (legacy single-threaded version)"""
 
     result = run_single_test((issue_content, issue_number))
     return result[1]  # Return success status
 
+# Relative simulated time of each test duration, and the issue fields that
+# scale a test's run time; read without a full parse to order the batch
+_DURATION_COST = {'brief': 1, 'standard': 10, 'comprehensive': 100}
+_DURATION_RE = re.compile(r'Test Duration[^:]*(?::\s*)?(Brief|Standard|Comprehensive)', re.IGNORECASE)
+_WIDTH_RE = re.compile(r'Data Width\D*(\d+)', re.IGNORECASE)
+_SLAVES_RE = re.compile(r'Number of Slaves\D*(\d+)', re.IGNORECASE)
+
+def _estimate_cost(issue_content):
+    """Rough relative run time of a test, from its issue body"""
+    duration = _DURATION_RE.search(issue_content)
+    width = _WIDTH_RE.search(issue_content)
+    slaves = _SLAVES_RE.search(issue_content)
+    return (_DURATION_COST[duration.group(1).lower() if duration else 'standard'],
+            (int(width.group(1)) if width else 8) * (int(slaves.group(1)) if slaves else 1))
+
 def run_all_tests_parallel(test_configs, max_workers=None):
     """Run all test configurations in parallel using multiprocessing"""
 
@@ -277,6 +316,8 @@ def run_all_tests_parallel(test_configs, max_workers=None):
 
     # Prepare test arguments
     test_args = [(config["content"], config["issue"]) for config in test_configs.values()]
+    # Longest tests first, so short ones backfill workers at the end of the run
+    test_args.sort(key=lambda args: _estimate_cost(args[0]), reverse=True)
 
     start_time = time.time()
 
@@ -286,14 +327,15 @@ def run_all_tests_parallel(test_configs, max_workers=None):
 
     with ProcessPoolExecutor(max_workers=max_workers) as executor:
         # Submit all tests
-        future_to_test = {executor.submit(run_single_test, args): args[1] for args in test_args}
+        future_to_test = {executor.submit(run_single_test_captured, args): args[1] for args in test_args}
 
         # Collect results as they complete
         for future in as_completed(future_to_test):
             test_name = future_to_test[future]
             try:
                 result = future.result(timeout=600)  # 10 minute timeout per test
-                issue_number, success, error = result
+                issue_number, success, error, output = result
+                sys.stdout.write(output)
                 results.append((test_name, success, error))
                 status = "✅ PASSED" if success else "❌ FAILED"
                 print(f"[{len(results)}/{len(test_configs)}] {test_name}: {status}")
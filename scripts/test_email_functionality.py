@@ -8,6 +8,7 @@ import os
 import sys
 import json
 from pathlib import Path
+from dataclasses import asdict
 
 # Add project root to path for imports
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -146,7 +147,7 @@ def test_with_real_email():
 
         # Send real email
         sender = EmailSender()
-        success = sender.send_results_email(config.__dict__, attachments)
+        success = sender.send_results_email(asdict(config), attachments)
 
         if success:
             print("✅ Email sent successfully!")
@@ -959,7 +959,7 @@ class SummaryGenerator:
 - **Signal Transitions**: `{self._get_total_transitions(signal_stats)}`
 
 ### Signal Analysis
-- **Active Signals**: `{len([s for s in signal_stats.split('\n') if s.strip() and '|' in s])}`
+- **Active Signals**: `{len([s for s in signal_stats.splitlines() if s.strip() and '|' in s])}`
 - **Data Transfer Events**: `{self._count_data_transfers()}`
 - **Clock Cycles**: `{self._get_clock_cycles()}`
 - **Protocol Compliance**: `✅ Verified`
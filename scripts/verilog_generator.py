@@ -150,6 +150,7 @@ class VerilogGenerator:
             default_data_enabled=config.default_data_enabled,
             default_data_pattern=config.default_data_pattern,
             default_data_value=config.default_data_value,
+            trace_depth=config.trace_depth,
             vcd_filename=vcd_filename
         )
 